@@ -0,0 +1,100 @@
+"""
+Dump the signups and round results of every tournament to files, several tournaments at a time.
+
+Each tournament gets its own file per dataset, streamed in keyset batches like the export endpoints, so
+memory use stays flat however large the tournaments are. Run from the backend directory:
+
+    python -m app.cli.export OUTPUT_DIR [--format csv|ndjson|parquet] [--dataset signups|results]
+                             [--tournament ID ...] [--concurrency 8] [--gzip]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.core.log import configure_logging
+from app.db.database import get_async_database_session, dispose_engines
+from app.models.db_models import Tournament as db_tournament
+from app.utils.export import EXPORT_DATASETS, EXPORT_FORMATS, validate_export, export_stream
+
+
+async def all_tournament_ids():
+    async with get_async_database_session() as db:
+        return (await db.execute(select(db_tournament.id).order_by(db_tournament.id))).scalars().all()
+
+
+async def export_file(path, dataset, export_format, tournament_id, compress):
+    written = 0
+    # Written to a temporary name first so an interrupted run never leaves a truncated file behind
+    f = open(path + '.part', 'wb')
+    try:
+        with f:
+            async for chunk in export_stream(dataset, export_format, [tournament_id], compress=compress):
+                f.write(chunk)
+                written += len(chunk)
+    except BaseException:
+        os.remove(path + '.part')
+        raise
+    os.replace(path + '.part', path)
+    return written
+
+
+async def run(args):
+    tournament_ids = args.tournament or await all_tournament_ids()
+    _, extension = EXPORT_FORMATS[args.format]
+    suffix = '.gz' if args.gzip else ''
+    semaphore = asyncio.Semaphore(args.concurrency)
+    failed = []
+
+    async def export_tournament(tournament_id, dataset):
+        path = os.path.join(args.output_dir, f"tournament-{tournament_id}-{dataset}.{extension}{suffix}")
+        async with semaphore:
+            try:
+                written = await export_file(path, dataset, args.format, tournament_id, args.gzip)
+            except Exception as e:
+                failed.append(tournament_id)
+                print(f"{path}: failed: {e}", file=sys.stderr)
+                return 0
+        return written
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    started = time.perf_counter()
+    try:
+        sizes = await asyncio.gather(*(export_tournament(tournament_id, dataset)
+                                       for tournament_id in tournament_ids for dataset in args.dataset))
+    finally:
+        await dispose_engines()
+
+    print(f"Exported {len(tournament_ids)} tournaments ({sum(sizes) / 1e6:.1f} MB) "
+          f"in {time.perf_counter() - started:.1f}s to {args.output_dir}")
+    return not failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('output_dir')
+    parser.add_argument('--format', default='csv', help=f"One of {', '.join(EXPORT_FORMATS)}")
+    parser.add_argument('--dataset', action='append',
+                        help=f"Any of {', '.join(EXPORT_DATASETS)}, repeatable; all of them by default")
+    parser.add_argument('--tournament', type=int, action='append', help='Tournament id, repeatable; all by default')
+    parser.add_argument('--concurrency', type=int, default=8, help='Tournaments exported at the same time')
+    parser.add_argument('--gzip', action='store_true', help='Gzip the files (not useful for Parquet)')
+    args = parser.parse_args()
+    args.dataset = args.dataset or list(EXPORT_DATASETS)
+
+    try:
+        for dataset in args.dataset:
+            validate_export(dataset, args.format)
+    except HTTPException as e:
+        parser.error(e.detail)
+
+    configure_logging()
+    sys.exit(0 if asyncio.run(run(args)) else 1)
+
+
+if __name__ == '__main__':
+    main()
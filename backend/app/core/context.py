@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import os
+import time
+
+from sqlalchemy import text
+
+from app.core.security import password_hasher
+from app.db.database import get_async_engine, dispose_engines, secret_name as database_secret_name
+from app.utils.get_secret import get_secret
+from app.utils.google_clients import registry, DRIVE_SCOPES, FORMS_SCOPES, get_drive_service, get_forms_service
+from app.utils.google_services import get_google_creds
+from app.utils.jobs import provisioning_queue
+from app.utils.scheduler import deadline_scheduler
+from app.utils.signup_stream import signup_hub
+
+# Resources to initialise during startup instead of on first use, any of 'secrets', 'database' and 'google'.
+# Empty by default so a new instance starts serving as soon as possible; the first request pays instead.
+STARTUP_WARMUP = [stage.strip() for stage in os.getenv('STARTUP_WARMUP', '').split(',') if stage.strip()]
+
+GOOGLE_SECRET_NAME = 'google-sheets-key'
+GOOGLE_REGION_NAME = 'us-west-2'
+
+logger = logging.getLogger(__name__)
+
+
+def warm_secrets():
+    get_secret(database_secret_name)
+    get_google_creds(GOOGLE_SECRET_NAME, GOOGLE_REGION_NAME)
+
+
+async def warm_database():
+    # Creating the engine is cheap; opening the first pooled connection is the slow part
+    async with get_async_engine().connect() as connection:
+        await connection.execute(text('SELECT 1'))
+
+
+def warm_google():
+    google_creds = get_google_creds(GOOGLE_SECRET_NAME, GOOGLE_REGION_NAME)
+    # Imports the client libraries and builds the services for this worker thread
+    get_drive_service(google_creds)
+    get_forms_service(google_creds)
+    for scopes in (DRIVE_SCOPES, FORMS_SCOPES):
+        registry.get_credentials(google_creds, scopes).get_access_token()
+
+
+WARMUP_STAGES = {
+    'secrets': lambda: asyncio.to_thread(warm_secrets),
+    'database': warm_database,
+    'google': lambda: asyncio.to_thread(warm_google),
+}
+
+
+class AppContext:
+    """
+    Owns the process-wide resources started and stopped with the application.
+
+    Secrets, database engines and Google clients are created lazily on first use; stages listed in
+    STARTUP_WARMUP are initialised up front instead. Time spent in each startup phase is kept in
+    ``timings`` (seconds) and logged once startup completes.
+    """
+
+    def __init__(self, warmup=None):
+        self.warmup = STARTUP_WARMUP if warmup is None else warmup
+        self.timings = {}
+
+    async def _timed(self, phase, coroutine):
+        start = time.perf_counter()
+        try:
+            await coroutine
+        finally:
+            self.timings[phase] = time.perf_counter() - start
+
+    async def startup(self, import_seconds=None):
+        start = time.perf_counter()
+        if import_seconds is not None:
+            self.timings['imports'] = import_seconds
+
+        for stage in self.warmup:
+            if stage not in WARMUP_STAGES:
+                logger.warning("Unknown warmup stage '%s'", stage)
+                continue
+            try:
+                await self._timed(f'warmup.{stage}', WARMUP_STAGES[stage]())
+            except Exception:
+                # Not fatal: the resource is initialised again on first use
+                logger.exception("Warmup of %s failed", stage)
+
+        # Neither touches the database here: their first queries run in background tasks that log and
+        # retry failures, so an unreachable database doesn't stop the app from starting
+        await self._timed('provisioning_queue', provisioning_queue.start())
+        await self._timed('deadline_scheduler', deadline_scheduler.start())
+        self.timings['startup'] = time.perf_counter() - start
+        logger.info("Startup complete: %s",
+                    ', '.join(f"{phase}={seconds * 1000:.1f}ms" for phase, seconds in self.timings.items()))
+
+    async def shutdown(self):
+        await signup_hub.stop()
+        await deadline_scheduler.stop()
+        await provisioning_queue.stop()
+        password_hasher.shutdown()
+        await dispose_engines()
+
+
+app_context = AppContext()
@@ -0,0 +1,167 @@
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Root level, e.g. INFO or WARNING
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+# Per-module overrides, e.g. "app.core.token=DEBUG,sqlalchemy.engine=WARNING"
+LOG_LEVELS = os.getenv('LOG_LEVELS', '')
+# 'json' for one JSON object per line, 'text' for human-readable local output
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+# Fraction of DEBUG records kept, so debug logging can stay on for hot paths without flooding the pipeline
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv('LOG_DEBUG_SAMPLE_RATE', '1'))
+# Records waiting for the writer thread; further records are dropped rather than blocking the caller
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+request_id_var = ContextVar('request_id', default=None)
+
+# Attributes every LogRecord has; anything else was passed through ``extra`` and is logged as a field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'request_id'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as a single-line JSON object, including fields passed through ``extra``."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if getattr(record, 'request_id', None):
+            entry['request_id'] = record.request_id
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES and not name.startswith('_'):
+                entry[name] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RequestIdFilter(logging.Filter):
+    """Attaches the id of the request being handled, if any, to every record."""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps only ``rate`` of the records below INFO; INFO and above always pass."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.INFO or self.rate >= 1 or random.random() < self.rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to a QueueListener thread, which does the formatting and I/O.
+
+    Only the message interpolation happens in the calling thread, since the arguments may change
+    after the call returns. When the queue is full the record is dropped and counted.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def parse_levels(levels):
+    """Parse "name=LEVEL,name=LEVEL" into a dictionary."""
+    parsed = {}
+    for item in levels.split(','):
+        if '=' in item:
+            name, level = item.split('=', 1)
+            parsed[name.strip()] = level.strip().upper()
+    return parsed
+
+
+_listener = None
+
+
+def configure_logging(level=LOG_LEVEL, levels=LOG_LEVELS, log_format=LOG_FORMAT,
+                      debug_sample_rate=LOG_DEBUG_SAMPLE_RATE, queue_size=LOG_QUEUE_SIZE, stream=None):
+    """
+    Route all logging through a bounded queue to a background writer thread. Safe to call again,
+    in which case the previous configuration is replaced.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if log_format == 'json' else logging.Formatter(
+        '%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s'))
+
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+    # Filters run in the calling thread, where the request id is known and before anything is queued
+    handler.addFilter(RequestIdFilter())
+    handler.addFilter(SamplingFilter(debug_sample_rate))
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+    for name, module_level in parse_levels(levels).items():
+        logging.getLogger(name).setLevel(module_level)
+
+    _listener = QueueListener(handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    return handler
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+async def request_id_middleware(request, call_next):
+    # Reuse the caller's id (e.g. from the load balancer) so logs can be correlated across services
+    request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers[REQUEST_ID_HEADER] = request_id
+    return response
@@ -0,0 +1,194 @@
+import bisect
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = tuple(float(bound) for bound in os.getenv(
+    'METRICS_LATENCY_BUCKETS', '0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10').split(','))
+# Upper bounds of the queries-per-request histogram buckets
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# Requests running more queries than this are logged, which is usually an N+1 query pattern
+QUERY_COUNT_WARNING = int(os.getenv('METRICS_QUERY_COUNT_WARNING', '20'))
+
+logger = logging.getLogger(__name__)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(f'{name}="{str(value)}"'.replace('\n', ' ') for name, value in zip(names, values))
+    return '{' + pairs + '}'
+
+
+class Histogram:
+    """Prometheus-style cumulative histogram with a fixed set of labels."""
+
+    def __init__(self, name, description, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0, 0.0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += 1
+            series[2] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = {key: (list(counts), count, total) for key, (counts, count, total) in self._series.items()}
+        for label_values, (counts, count, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labels + ('le',), label_values + (f'{bound:g}',))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labels + ('le',), label_values + ('+Inf',))
+            lines.append(f'{self.name}_bucket{labels} {count}')
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f'{self.name}_sum{labels} {total}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return '\n'.join(lines)
+
+
+class Counter:
+    def __init__(self, name, description, labels=()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} counter']
+        with self._lock:
+            values = dict(self._values)
+        for label_values, value in sorted(values.items()):
+            lines.append(f'{self.name}{_format_labels(self.labels, label_values)} {value}')
+        return '\n'.join(lines)
+
+
+request_duration = Histogram('http_request_duration_seconds', 'Time spent handling HTTP requests',
+                             labels=('method', 'route', 'status'))
+request_db_queries = Histogram('http_request_db_queries', 'Database queries executed per HTTP request',
+                               labels=('method', 'route'), buckets=QUERY_COUNT_BUCKETS)
+span_duration = Histogram('span_duration_seconds', 'Time spent in instrumented operations',
+                          labels=('phase', 'operation'))
+db_queries = Counter('db_queries_total', 'Database queries executed')
+
+METRICS = [request_duration, request_db_queries, span_duration, db_queries]
+
+
+class RequestTimings:
+    """Accumulated time and call count per phase for one request. Spans may finish in worker threads."""
+
+    def __init__(self):
+        self.phases = {}
+        self.db_queries = 0
+        self._lock = threading.Lock()
+
+    def add(self, phase, seconds):
+        with self._lock:
+            total, count = self.phases.get(phase, (0.0, 0))
+            self.phases[phase] = (total + seconds, count + 1)
+
+    def count_query(self):
+        with self._lock:
+            self.db_queries += 1
+
+    def server_timing(self, total):
+        entries = [f'{phase};dur={seconds * 1000:.1f};desc="{count} calls"'
+                   for phase, (seconds, count) in sorted(self.phases.items())]
+        entries.append(f'db-queries;desc="{self.db_queries}"')
+        entries.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(entries)
+
+
+# Timings of the request being handled; asyncio.to_thread copies the context, so worker threads report here too
+request_timings_var = ContextVar('request_timings', default=None)
+
+
+def record_span(phase, seconds, operation=''):
+    span_duration.observe(seconds, phase, operation)
+    timings = request_timings_var.get()
+    if timings is not None:
+        timings.add(phase, seconds)
+
+
+@contextmanager
+def span(phase, operation=''):
+    """
+    Time a block, adding it to the current request's Server-Timing header and the span histogram.
+
+    :param phase: Coarse group reported in Server-Timing, e.g. 'google.drive' or 'password'
+    :param operation: Finer label for the histogram, e.g. 'files.create'
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(phase, time.perf_counter() - start, operation)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    record_span('db', time.perf_counter() - conn.info['query_start'].pop(), 'query')
+    db_queries.inc()
+    timings = request_timings_var.get()
+    if timings is not None:
+        timings.count_query()
+
+
+def instrument_engine(engine):
+    """Count and time every statement an engine executes; pass ``async_engine.sync_engine`` for async engines."""
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def render_metrics(*extra):
+    """Prometheus text exposition of every metric, followed by ``extra`` pre-rendered blocks."""
+    return '\n'.join([metric.render() for metric in METRICS] + list(extra)) + '\n'
+
+
+async def metrics_middleware(request, call_next):
+    timings = RequestTimings()
+    token = request_timings_var.set(timings)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        request_timings_var.reset(token)
+    elapsed = time.perf_counter() - start
+
+    # Label by route template rather than path, so ids in the URL don't create a series each
+    route = request.scope.get('route')
+    route = route.path if route is not None else 'unmatched'
+    request_duration.observe(elapsed, request.method, route, response.status_code)
+    request_db_queries.observe(timings.db_queries, request.method, route)
+    if timings.db_queries > QUERY_COUNT_WARNING:
+        logger.warning("%s %s ran %s database queries", request.method, route, timings.db_queries,
+                       extra={'db_queries': timings.db_queries})
+    response.headers['Server-Timing'] = timings.server_timing(elapsed)
+    return response
@@ -0,0 +1,78 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.core.metrics import span
+
+# Comma separated passlib schemes; the first one is used for new hashes and the rest are rehashed on login
+PASSWORD_SCHEMES = [scheme.strip() for scheme in os.getenv('PASSWORD_SCHEMES', 'bcrypt').split(',')]
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+ARGON2_TIME_COST = int(os.getenv('ARGON2_TIME_COST', '3'))
+ARGON2_MEMORY_COST = int(os.getenv('ARGON2_MEMORY_COST', '65536'))
+# Threads dedicated to hashing; bcrypt and argon2 release the GIL so these run in parallel
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', str(os.cpu_count() or 2)))
+# Hashes allowed to be running or waiting for a worker before requests are turned away with a 503
+PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', str(PASSWORD_HASH_WORKERS * 8)))
+
+
+def create_password_context(schemes=PASSWORD_SCHEMES):
+    settings = {}
+    if 'bcrypt' in schemes:
+        settings['bcrypt__rounds'] = BCRYPT_ROUNDS
+    if 'argon2' in schemes:
+        settings['argon2__time_cost'] = ARGON2_TIME_COST
+        settings['argon2__memory_cost'] = ARGON2_MEMORY_COST
+    # 'auto' marks every scheme but the first, and hashes with outdated settings, as needing an update
+    return CryptContext(schemes=schemes, deprecated='auto', **settings)
+
+
+pwd_context = create_password_context()
+
+
+class PasswordHasher:
+    """
+    Runs password hashing on a dedicated, size-limited thread pool so it never blocks the event loop.
+
+    At most ``max_pending`` operations may be running or queued; beyond that callers get a 503 instead
+    of piling up behind a login burst.
+    """
+
+    def __init__(self, context=pwd_context, workers=PASSWORD_HASH_WORKERS, max_pending=PASSWORD_HASH_MAX_PENDING):
+        self.context = context
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        # Only touched from the event loop thread, so a plain counter is enough
+        self._pending = 0
+
+    async def _run(self, func, *args):
+        if self._pending >= self.max_pending:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                detail="Server is busy, please try again shortly", headers={'Retry-After': '1'})
+        self._pending += 1
+        try:
+            # Includes time spent waiting for a free worker
+            with span('password', func.__name__):
+                return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password):
+        return await self._run(self.context.hash, password)
+
+    async def verify_and_update(self, password, hashed_password):
+        """
+        Check a password against its stored hash.
+
+        :return: Tuple of (verified, new_hash); new_hash is set when the stored hash uses an outdated
+            scheme or cost and should be replaced
+        """
+        return await self._run(self.context.verify_and_update, password, hashed_password)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+password_hasher = PasswordHasher()
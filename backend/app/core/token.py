@@ -1,80 +1,99 @@
 from datetime import datetime, timedelta, timezone
 import logging
+import time
 
 from fastapi import HTTPException, Depends
 from fastapi.security import OAuth2PasswordBearer
 import jwt
+from sqlalchemy import select
 
-from app.db.database import get_db, get_database_session
-from app.models.db_models import User as db_user, user_tournaments, Tournament as db_tournament
-from app.models.models import Tournament, User, UserProfile
+from app.db.database import get_async_database_session
+from app.models.db_models import User as db_user
+from app.models.models import TokenUser
+from app.utils.cache import TTLCache
 from app.utils.get_secret import get_secret
 
-# Fetch secrets from AWS Secrets Manager
-secrets = get_secret('tft-tournament-keys')
-key = secrets.get('secret_key')  # Use 'fallback_secret_key' if 'secret_key' not found
+secret_name = 'tft-tournament-keys'
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 300
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
-logging.basicConfig(level=logging.DEBUG)
+# Decoded payloads are kept until the token expires, so repeat requests skip signature verification
+decoded_tokens = TTLCache(maxsize=10000)
+# Users resolved from the database for tokens issued without the 'uid'/'email' claims. Nothing
+# invalidates entries: a change to a user's email shows up here within USER_CACHE_TTL seconds, and in
+# tokens carrying the claims only once the user logs in again (tokens live ACCESS_TOKEN_EXPIRE_MINUTES).
+# An endpoint that changes usernames or emails must delete the user's entry here.
+USER_CACHE_TTL = 300
+user_cache = TTLCache(maxsize=1024, ttl=USER_CACHE_TTL)
+
+logger = logging.getLogger(__name__)
+
+
+def get_signing_key():
+    # Read through the secrets cache on use instead of at import, so importing the app needs no AWS call
+    return get_secret(secret_name).get('secret_key')
 
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
+    """
+    Create a signed JWT. Besides 'sub' (the username), callers should include the 'uid' and 'email'
+    claims so authenticated requests can identify the user without a database lookup.
+    """
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (expires_delta if expires_delta else timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, key, algorithm=ALGORITHM)
-    logging.debug(f"Token created with expiry {expire} and data {to_encode}")
+    encoded_jwt = jwt.encode(to_encode, get_signing_key(), algorithm=ALGORITHM)
+    # Only the subject is logged: the claims include the user's email
+    logger.debug("Token created for %s, expires %s", to_encode.get('sub'), expire)
     return encoded_jwt
 
 
+def decode_token(token: str):
+    payload = decoded_tokens.get(token)
+    if payload is None:
+        payload = jwt.decode(token, get_signing_key(), algorithms=[ALGORITHM])
+        expires_in = payload.get('exp', 0) - time.time()
+        if expires_in > 0:
+            decoded_tokens.set(token, payload, ttl=expires_in)
+    return payload
+
+
 def verify_token(token: str, credentials_exception):
+    return get_token_claims(token, credentials_exception).get("sub")
+
+
+def get_token_claims(token: str, credentials_exception):
     try:
-        payload = jwt.decode(token, key, algorithms=[ALGORITHM])
-        logging.debug(f"Decoded payload: {payload}")
+        payload = decode_token(token)
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
-        return username
+        return payload
     except jwt.ExpiredSignatureError as e:
-        logging.error("Token expired: " + str(e))
+        logger.info("Token expired: %s", e)
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.DecodeError as e:
-        logging.error("Token decode error: " + str(e))
+        logger.warning("Token decode error: %s", e)
         raise credentials_exception
 
 
-def get_user_from_token(token: str = Depends(oauth2_scheme)):
-    try:
-        username = verify_token(token, credentials_exception=HTTPException(status_code=401, detail="Invalid token"))
-        logging.debug(f"Username from token: {username}")
-
-        with get_database_session() as db:
-            user = db.query(db_user).filter(db_user.username == username).first()
-            if not user:
-                raise HTTPException(status_code=404, detail="User not found")
-            logging.debug(f"User record: {user}")
-
-            user_tournaments_query = db.query(user_tournaments).filter(user_tournaments.c.user_id == user.id).all()
-            tournaments = []
-            for ut in user_tournaments_query:
-                tournament = db.query(db_tournament).filter(db_tournament.id == ut.tournament_id).first()
-                tournaments.append(
-                    Tournament(
-                        id=tournament.id,
-                        name=tournament.name,
-                        link=tournament.link,
-                        organizers=[user.id for user in tournament.organizers]
-                    )
-                )
-
-            user_profile = UserProfile(
-                username=user.username,
-                tournaments=tournaments,
-            )
-            logging.debug(f"UserProfile: {user_profile}")
-            return user_profile
-    except Exception as e:
-        logging.error(f"An unexpected error occurred: {e}")
-        raise HTTPException(status_code=500, detail="An error occurred")
\ No newline at end of file
+async def get_user_from_token(token: str = Depends(oauth2_scheme)) -> TokenUser:
+    credentials_exception = HTTPException(status_code=401, detail="Invalid token")
+    claims = get_token_claims(token, credentials_exception)
+    username = claims["sub"]
+
+    # Tokens carry the user id and email as signed claims, so no lookup is needed
+    if claims.get("uid") is not None and claims.get("email"):
+        return TokenUser(id=claims["uid"], username=username, email=claims["email"])
+
+    # Tokens issued before the claims were added fall back to a cached database lookup
+    user = user_cache.get(username)
+    if user is None:
+        async with get_async_database_session() as db:
+            record = (await db.execute(select(db_user).where(db_user.username == username))).scalars().first()
+        if not record:
+            raise HTTPException(status_code=404, detail="User not found")
+        user = TokenUser(id=record.id, username=record.username, email=record.email)
+        user_cache.set(username, user)
+    return user
@@ -1,37 +1,130 @@
+import os
+import threading
+from contextlib import asynccontextmanager, contextmanager
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from contextlib import contextmanager
+from app.core.metrics import instrument_engine
 from app.utils.get_secret import get_secret  # Adjust the import path as necessary
 
-# Fetch secrets from AWS Secrets Manager
+# Secret holding the database URL, fetched on first use rather than at import
 secret_name = "tft-tournament-keys"
-secrets = get_secret(secret_name)
 
-# Extract the database URL from the secrets
-DATABASE_URL = secrets["database_url"]
+# Connection pool settings, shared by the async engine and the sync engine used from worker threads
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '20'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+
+# Async drivers used for each sync dialect
+ASYNC_DRIVERS = {
+    'postgresql': 'asyncpg',
+    'postgres': 'asyncpg',
+    'sqlite': 'aiosqlite',
+    'mysql': 'aiomysql',
+}
+
+
+def to_async_url(url):
+    """Swap the driver of a database URL for its asyncio counterpart, e.g. postgresql:// -> postgresql+asyncpg://"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend in ASYNC_DRIVERS and url.get_driver_name() != ASYNC_DRIVERS[backend]:
+        url = url.set(drivername=f"{'postgresql' if backend == 'postgres' else backend}+{ASYNC_DRIVERS[backend]}")
+    return url
+
+
+def pool_options(url):
+    options = {'pool_pre_ping': DB_POOL_PRE_PING, 'pool_recycle': DB_POOL_RECYCLE}
+    # SQLite uses a single-connection or per-thread pool that doesn't take sizing arguments
+    if make_url(url).get_backend_name() != 'sqlite':
+        options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+    return options
+
+
+def get_database_url():
+    # DATABASE_URL overrides the secret, e.g. for local runs and benchmarks
+    return os.getenv('DATABASE_URL') or get_secret(secret_name)["database_url"]
+
+
+class _Engines:
+    """Creates the SQLAlchemy engines and session factories once, the first time they are needed."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.engine = None
+        self.async_engine = None
+        self.session_factory = None
+        self.async_session_factory = None
 
-# Create the SQLAlchemy engine
-engine = create_engine(DATABASE_URL)
+    def initialize(self):
+        if self.async_engine is not None:
+            return self
+        with self._lock:
+            if self.async_engine is None:
+                database_url = get_database_url()
+                engine = create_engine(database_url, **pool_options(database_url))
+                async_engine = create_async_engine(to_async_url(database_url), **pool_options(database_url))
+                instrument_engine(engine)
+                instrument_engine(async_engine.sync_engine)
+                self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+                self.async_session_factory = async_sessionmaker(bind=async_engine, class_=AsyncSession,
+                                                                autoflush=False, expire_on_commit=False)
+                self.engine = engine
+                self.async_engine = async_engine
+        return self
+
+
+_engines = _Engines()
+
+
+def get_engine():
+    return _engines.initialize().engine
+
+
+def get_async_engine():
+    return _engines.initialize().async_engine
+
+
+async def dispose_engines():
+    if _engines.async_engine is not None:
+        await _engines.async_engine.dispose()
+        _engines.engine.dispose()
+        _engines.reset()
 
-# Create a configured "Session" class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Create a Base class for declarative class definitions
 Base = declarative_base()
 
 @contextmanager
 def get_database_session():
-    """Provide a transactional scope around a series of operations."""
-    session = SessionLocal()
+    """Provide a transactional scope around a series of operations, for code running in worker threads."""
+    session = _engines.initialize().session_factory()
     try:
         yield session
     finally:
         session.close()
 
 def get_db():
-    db = SessionLocal()
+    db = _engines.initialize().session_factory()
     try:
         yield db
     finally:
         db.close()
+
+@asynccontextmanager
+async def get_async_database_session():
+    """Provide an async transactional scope around a series of operations."""
+    async with _engines.initialize().async_session_factory() as session:
+        yield session
+
+async def get_async_db():
+    async with _engines.initialize().async_session_factory() as session:
+        yield session
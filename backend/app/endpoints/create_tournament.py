@@ -1,55 +1,257 @@
-from fastapi import Depends, HTTPException, status, APIRouter
+import asyncio
+import logging
+import os
+from typing import List, Optional
+
+from fastapi import Depends, HTTPException, status, APIRouter, Header, Response
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app.core.token import oauth2_scheme
-from app.db.database import get_database_session
+from app.db.database import get_async_db
 from app.models.db_models import Tournament as db_tournament, user_tournaments
-from app.models.models import TournamentCreateRequest
+from app.models.models import TournamentCreateRequest, TournamentBatchCreateRequest, TournamentBatchResult
+from app.utils.cache import response_cache, user_profile_cache_keys
 from app.utils.get_user import get_current_user
-from app.utils.google_services import get_google_creds, create_google_sheet, create_google_form, \
-    delete_google_sheet, delete_google_form
+from app.utils.google_clients import error_status
+from app.utils.google_services import get_google_creds, sheet_link, form_link
+from app.utils.jobs import provisioning_queue
+from app.utils.provisioning import provision_google_files, cleanup_google_files
+from app.utils.scheduler import deadline_scheduler
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Largest number of tournaments accepted by one batch request
+BATCH_MAX_TOURNAMENTS = int(os.getenv('BATCH_MAX_TOURNAMENTS', '50'))
+# Tournaments whose Google files are provisioned at the same time within one batch
+BATCH_PROVISIONING_CONCURRENCY = int(os.getenv('BATCH_PROVISIONING_CONCURRENCY', '5'))
+
+
+async def after_tournaments_created(username: str, deadlines):
+    """
+    Bookkeeping once tournaments are committed. Failures are only logged: the tournaments exist and
+    keep their files, the scheduler's reload and the cache TTL catch up on their own.
+
+    :param deadlines: List of (tournament_id, sign_up_deadline) tuples
+    """
+    try:
+        for tournament_id, sign_up_deadline in deadlines:
+            deadline_scheduler.schedule(tournament_id, sign_up_deadline)
+        await response_cache.invalidate(*user_profile_cache_keys(username))
+    except Exception:
+        logger.exception("Post-creation steps for tournaments of %s failed", username)
+
+
+async def save_tournament(db: AsyncSession, request: TournamentCreateRequest, user_id: int,
+                          sheet_id: Optional[str] = None, form_id: Optional[str] = None,
+                          idempotency_key: Optional[str] = None):
+    provisioned = sheet_id is not None and form_id is not None
+    new_tournament = db_tournament(
+        name=request.name,
+        sheets_link=sheet_link(sheet_id) if provisioned else None,
+        form_link=form_link(form_id) if provisioned else None,
+        sign_up_deadline=request.sign_up_deadline,
+        start_date=request.start_date,
+        end_date=request.end_date,
+        status='ready' if provisioned else 'provisioning',
+        provisioning_step=None if provisioned else 'queued',
+        idempotency_key=idempotency_key,
+    )
+    db.add(new_tournament)
+    # Flush to get the tournament id so the organizer link goes in the same transaction
+    await db.flush()
+
+    new_user_tournament = user_tournaments.insert().values(
+        user_id=user_id,
+        tournament_id=new_tournament.id
+    )
+    await db.execute(new_user_tournament)
+    await db.commit()
+    return new_tournament.id
+
+
+async def get_tournament_by_idempotency_key(db: AsyncSession, idempotency_key: str, user_id: int):
+    tournament = (await db.execute(
+        select(db_tournament).options(selectinload(db_tournament.organizers))
+        .where(db_tournament.idempotency_key == idempotency_key)
+    )).scalars().first()
+    if not tournament:
+        return None
+    if user_id not in [organizer.id for organizer in tournament.organizers]:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Idempotency key already used")
+    return tournament.id, tournament.status
+
+
+async def mark_tournament_failed(db: AsyncSession, tournament_id: int, error: str):
+    await db.execute(update(db_tournament).where(db_tournament.id == tournament_id).values(
+        status='failed', provisioning_step=None, provisioning_error=error))
+    await db.commit()
+
+
+async def enqueue_tournament(db: AsyncSession, request: TournamentCreateRequest, user_id: int,
+                             idempotency_key: Optional[str]):
+    if idempotency_key:
+        existing = await get_tournament_by_idempotency_key(db, idempotency_key, user_id)
+        if existing:
+            tournament_id, tournament_status = existing
+            return {'tournament_id': tournament_id, 'status': tournament_status,
+                    'status_url': f"/tournament/{tournament_id}/status"}
+
+    if provisioning_queue.full():
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Too many tournaments are being created, please try again shortly")
+
+    tournament_id = await save_tournament(db, request, user_id, idempotency_key=idempotency_key)
+    if not provisioning_queue.enqueue(tournament_id):
+        await mark_tournament_failed(db, tournament_id, 'Provisioning queue is full')
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Too many tournaments are being created, please try again shortly")
+
+    return {'tournament_id': tournament_id, 'status': 'provisioning',
+            'status_url': f"/tournament/{tournament_id}/status"}
 
 
 @router.post('/create_tournament')
-async def create_tournament(request: TournamentCreateRequest, token: str = Depends(oauth2_scheme)):
+async def create_tournament(request: TournamentCreateRequest, response: Response, token: str = Depends(oauth2_scheme),
+                            background: bool = False, idempotency_key: Optional[str] = Header(None),
+                            db: AsyncSession = Depends(get_async_db)):
     secret_name = 'google-sheets-key'
     region_name = 'us-west-2'
-    google_creds = get_google_creds(secret_name, region_name)
 
-    user = get_current_user(token)
+    if background:
+        # Opt-in asynchronous mode: store the tournament and let the provisioning workers create the files
+        user = await get_current_user(token)
+        response.status_code = status.HTTP_202_ACCEPTED
+        result = await enqueue_tournament(db, request, user.id, idempotency_key)
+        # Scheduled by the provisioning job once the form exists
+        await after_tournaments_created(user.username, [])
+        return result
+
+    google_creds, user = await asyncio.gather(
+        asyncio.to_thread(get_google_creds, secret_name, region_name),
+        get_current_user(token),
+    )
 
     sheet_id = None
     form_id = None
 
     try:
-        sheet_id = create_google_sheet(f"Tournament: {request.name}", google_creds, user.email)
-        form_id = create_google_form(f"Tournament Sign-Up: {request.name}", google_creds, user.email)
-
-        with get_database_session() as db:
-            new_tournament = db_tournament(
-                name=request.name,
-                sheets_link=f"https://docs.google.com/spreadsheets/d/{sheet_id}/edit",
-                form_link=f"https://docs.google.com/forms/d/{form_id}/edit",
-                sign_up_deadline=request.sign_up_deadline,
-                start_date=request.start_date,
-                end_date=request.end_date,
-            )
-            db.add(new_tournament)
-            db.commit()
-            db.refresh(new_tournament)
-
-            new_user_tournament = user_tournaments.insert().values(
-                user_id=user.id,
-                tournament_id=new_tournament.id
-            )
-            db.execute(new_user_tournament)
-            db.commit()
-
-        return {'sheet_id': sheet_id, 'form_id': form_id}
+        sheet_id, form_id = await provision_google_files(request.name, google_creds, user.email)
+        tournament_id = await save_tournament(db, request, user.id, sheet_id, form_id)
     except Exception as e:
-        if sheet_id:
-            delete_google_sheet(sheet_id, google_creds)
-        if form_id:
-            delete_google_form(form_id, google_creds)
+        # provision_google_files cleans up after itself, so ids are only set here if the DB write failed
+        await cleanup_google_files(google_creds, sheet_id, form_id)
+        if error_status(e) == 429:
+            # Google quota still exhausted after the client's retries: ask the caller to come back later
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '60'},
+                                detail="Google API quota exceeded, please try again shortly")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error creating tournament: {str(e)}")
+
+    # Outside the try: the tournament is committed, so its files must not be cleaned up from here on
+    await after_tournaments_created(user.username, [(tournament_id, request.sign_up_deadline)])
+    return {'sheet_id': sheet_id, 'form_id': form_id}
+
+
+def validate_tournament_batch(tournaments: List[TournamentCreateRequest]):
+    """Check every tournament of a batch before any of them is provisioned."""
+    if not tournaments:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="No tournaments given")
+    if len(tournaments) > BATCH_MAX_TOURNAMENTS:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail=f"At most {BATCH_MAX_TOURNAMENTS} tournaments can be created at once")
+
+    errors = []
+    names = set()
+    for index, tournament in enumerate(tournaments):
+        if not tournament.name.strip():
+            errors.append({'index': index, 'error': "Name can't be empty"})
+        elif tournament.name in names:
+            errors.append({'index': index, 'error': f"Duplicate name '{tournament.name}' in batch"})
+        if tournament.end_date < tournament.start_date:
+            errors.append({'index': index, 'error': "End date is before start date"})
+        names.add(tournament.name)
+    if errors:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=errors)
+
+
+async def save_tournaments(db: AsyncSession, user_id: int, provisioned):
+    """
+    Insert provisioned tournaments and their organizer links in one transaction using bulk inserts.
+
+    :param provisioned: List of (TournamentCreateRequest, sheet_id, form_id)
+    :return: Tournament ids in the order of ``provisioned``
+    """
+    tournament_ids = (await db.execute(
+        insert(db_tournament).returning(db_tournament.id, sort_by_parameter_order=True),
+        [
+            {
+                'name': request.name,
+                'sheets_link': sheet_link(sheet_id),
+                'form_link': form_link(form_id),
+                'sign_up_deadline': request.sign_up_deadline,
+                'start_date': request.start_date,
+                'end_date': request.end_date,
+                'status': 'ready',
+            }
+            for request, sheet_id, form_id in provisioned
+        ]
+    )).scalars().all()
+    await db.execute(user_tournaments.insert(), [
+        {'user_id': user_id, 'tournament_id': tournament_id} for tournament_id in tournament_ids
+    ])
+    await db.commit()
+    return tournament_ids
+
+
+@router.post('/tournaments/batch', response_model=List[TournamentBatchResult])
+async def create_tournaments_batch(request: TournamentBatchCreateRequest, token: str = Depends(oauth2_scheme),
+                                   db: AsyncSession = Depends(get_async_db)):
+    validate_tournament_batch(request.tournaments)
+
+    # Auth, secret and Google clients are resolved once for the whole batch
+    google_creds, user = await asyncio.gather(
+        asyncio.to_thread(get_google_creds, 'google-sheets-key', 'us-west-2'),
+        get_current_user(token),
+    )
+
+    semaphore = asyncio.Semaphore(BATCH_PROVISIONING_CONCURRENCY)
+
+    async def provision(tournament: TournamentCreateRequest):
+        async with semaphore:
+            return await provision_google_files(tournament.name, google_creds, user.email)
+
+    outcomes = await asyncio.gather(*(provision(tournament) for tournament in request.tournaments),
+                                    return_exceptions=True)
+
+    results = [
+        TournamentBatchResult(index=index, name=tournament.name, status='failed', error=str(outcome))
+        if isinstance(outcome, BaseException) else
+        TournamentBatchResult(index=index, name=tournament.name, status='created', sheet_id=outcome[0],
+                              form_id=outcome[1])
+        for index, (tournament, outcome) in enumerate(zip(request.tournaments, outcomes))
+    ]
+    created = [result for result in results if result.status == 'created']
+    if not created:
+        return results
+
+    try:
+        tournament_ids = await save_tournaments(db, user.id, [
+            (request.tournaments[result.index], result.sheet_id, result.form_id) for result in created
+        ])
+    except Exception as e:
+        # Nothing was stored, so none of the provisioned files may be kept
+        await asyncio.gather(*(cleanup_google_files(google_creds, result.sheet_id, result.form_id)
+                               for result in created))
+        for result in created:
+            result.status, result.sheet_id, result.form_id = 'failed', None, None
+            result.error = f"Error saving tournament: {e}"
+        return results
+
+    for result, tournament_id in zip(created, tournament_ids):
+        result.tournament_id = tournament_id
+    await after_tournaments_created(user.username, [
+        (result.tournament_id, request.tournaments[result.index].sign_up_deadline) for result in created
+    ])
+    return results
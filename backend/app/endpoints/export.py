@@ -0,0 +1,55 @@
+from typing import List
+
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_async_db
+from app.models.db_models import Tournament as db_tournament
+from app.utils.export import EXPORT_FORMATS, EXPORT_MAX_TOURNAMENTS, validate_export, export_stream
+
+router = APIRouter()
+
+
+def export_response(request: Request, dataset: str, export_format: str, tournament_ids, filename: str):
+    media_type, extension = EXPORT_FORMATS[export_format]
+    headers = {'Content-Disposition': f'attachment; filename="{filename}.{extension}"', 'Vary': 'Accept-Encoding'}
+    compress = export_format != 'parquet' and 'gzip' in request.headers.get('accept-encoding', '')
+    if compress:
+        headers['Content-Encoding'] = 'gzip'
+    return StreamingResponse(export_stream(dataset, export_format, tournament_ids, compress=compress),
+                             media_type=media_type, headers=headers)
+
+
+@router.get('/tournament/{tournament_id}/export')
+async def export_tournament(tournament_id: int, request: Request, dataset: str = 'signups',
+                            export_format: str = Query('csv', alias='format'),
+                            db: AsyncSession = Depends(get_async_db)):
+    """Download a tournament's signups or round results as CSV, NDJSON or Parquet."""
+    validate_export(dataset, export_format)
+    if await db.get(db_tournament, tournament_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found")
+    return export_response(request, dataset, export_format, [tournament_id],
+                           f"tournament-{tournament_id}-{dataset}")
+
+
+@router.get('/tournaments/export')
+async def export_tournaments(request: Request, ids: List[int] = Query(...), dataset: str = 'signups',
+                             export_format: str = Query('csv', alias='format'),
+                             db: AsyncSession = Depends(get_async_db)):
+    """Download the signups or round results of several tournaments as one file, in the order given."""
+    validate_export(dataset, export_format)
+    tournament_ids = list(dict.fromkeys(ids))
+    if len(tournament_ids) > EXPORT_MAX_TOURNAMENTS:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail=f"At most {EXPORT_MAX_TOURNAMENTS} tournaments can be exported at once")
+
+    found = set((await db.execute(
+        select(db_tournament.id).where(db_tournament.id.in_(tournament_ids))
+    )).scalars().all())
+    missing = [tournament_id for tournament_id in tournament_ids if tournament_id not in found]
+    if missing:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f"Tournaments not found: {', '.join(map(str, missing))}")
+    return export_response(request, dataset, export_format, tournament_ids, f"tournaments-{dataset}")
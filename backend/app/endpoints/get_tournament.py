@@ -1,27 +1,119 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from sqlalchemy.orm import Session
+import asyncio
+from typing import Optional
 
-from app.db.database import get_database_session
-from app.models.db_models import Tournament as db_tournament, User as db_user
-from app.models.models import Tournament
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.db.database import get_async_db
+from app.models.db_models import Tournament as db_tournament, Signup as db_signup
+from app.models.models import Tournament, TournamentStatus, Signup, SignupPage
+from app.utils.cache import response_cache, tournament_cache_key, cached_json_response, encode_json
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.utils.serialization import model_response
+from app.utils.signup_stream import signup_hub, load_signups_after, format_event, SIGNUP_STREAM_HEARTBEAT
 
 router = APIRouter()
 
 
+# Declared before the /{tournament_name} route so 'status' isn't taken for a tournament name
+@router.get('/tournament/{tournament_id}/status', response_model=TournamentStatus)
+async def get_tournament_status(tournament_id: int, db: AsyncSession = Depends(get_async_db)):
+    tournament = await db.get(db_tournament, tournament_id)
+    if not tournament:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found")
+
+    return TournamentStatus(
+        id=tournament.id,
+        status=tournament.status,
+        step=tournament.provisioning_step,
+        attempts=tournament.provisioning_attempts,
+        error=tournament.provisioning_error,
+        sheets_link=tournament.sheets_link if tournament.status == 'ready' else None,
+        form_link=tournament.form_link if tournament.status == 'ready' else None,
+        signups_closed_at=tournament.signups_closed_at,
+    )
+
+
+@router.get('/tournament/{tournament_id}/signups', response_model=SignupPage)
+async def get_tournament_signups(tournament_id: int, cursor: Optional[int] = None,
+                                 limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                                 db: AsyncSession = Depends(get_async_db)):
+    if await db.get(db_tournament, tournament_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found")
+
+    # Served from the signups table filled by the response sync, in sign-up order
+    query = select(db_signup.id, db_signup.game_name, db_signup.tag_line, db_signup.submitted_at).where(
+        db_signup.tournament_id == tournament_id)
+    if cursor is not None:
+        query = query.where(db_signup.id > cursor)
+    rows = (await db.execute(query.order_by(db_signup.id).limit(limit + 1))).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return model_response(SignupPage.construct_trusted(
+        items=[Signup.from_db(row) for row in rows],
+        next_cursor=rows[-1].id if has_more else None,
+    ))
+
+
+@router.get('/tournament/{tournament_id}/signups/stream')
+async def stream_tournament_signups(tournament_id: int, request: Request, after: Optional[int] = None,
+                                    last_event_id: Optional[int] = Header(None),
+                                    db: AsyncSession = Depends(get_async_db)):
+    """
+    Server-Sent Events stream of new signups. Pass ``after`` (or reconnect with Last-Event-ID) to first
+    replay the signups after that id; up to MAX_PAGE_SIZE * 10 are replayed, use /signups for more.
+    """
+    tournament = await db.get(db_tournament, tournament_id)
+    if not tournament:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found")
+    if tournament.status != 'ready':
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Tournament is not provisioned yet")
+    resume_after = last_event_id if last_event_id is not None else after
+
+    async def events():
+        async with signup_hub.subscribe(tournament_id) as subscriber:
+            sent_id = 0
+            if resume_after is not None:
+                sent_id = resume_after
+                for signup in await load_signups_after(tournament_id, resume_after, limit=MAX_PAGE_SIZE * 10):
+                    sent_id = signup.id
+                    yield format_event(signup)
+
+            while not await request.is_disconnected():
+                try:
+                    signup = await asyncio.wait_for(subscriber.queue.get(), SIGNUP_STREAM_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if subscriber.overflowed:
+                    # Too slow to keep up: drop the client, it can resume from the last id it received
+                    yield "event: overflow\ndata: {}\n\n"
+                    return
+                # Signups already sent while replaying are skipped
+                if signup.id > sent_id:
+                    sent_id = signup.id
+                    yield format_event(signup)
+
+    return StreamingResponse(events(), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
 @router.get('/tournament/{tournament_id}/{tournament_name}', response_model=Tournament)
-async def get_tournament(tournament_id: int, tournament_name: str):
-    with get_database_session() as db:
-        tournament = db.query(db_tournament).filter(db_tournament.id == tournament_id).first()
+async def get_tournament(tournament_id: int, tournament_name: str, request: Request,
+                         db: AsyncSession = Depends(get_async_db)):
+    cache_key = tournament_cache_key(tournament_id, tournament_name)
+    cached = await response_cache.get(cache_key)
+    if cached is None:
+        tournament = (await db.execute(
+            select(db_tournament).options(selectinload(db_tournament.organizers)).where(db_tournament.id == tournament_id)
+        )).scalars().first()
         if not tournament or tournament.name != tournament_name:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found")
 
-        organizers = db.query(db_user).join(db_tournament.organizers).filter(db_tournament.id == tournament_id).all()
-        organizer_usernames = [organizer.username for organizer in organizers]
+        cached = await response_cache.set(cache_key, encode_json(Tournament.from_db(tournament)))
 
-        return Tournament(
-            id=tournament.id,
-            name=tournament.name,
-            sheets_link=tournament.sheets_link,
-            form_link=tournament.form_link,
-            organizers=organizer_usernames
-        )
+    return cached_json_response(request, cached)
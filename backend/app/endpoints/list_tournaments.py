@@ -0,0 +1,54 @@
+from datetime import date, datetime
+from typing import Optional, Union
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_async_db
+from app.models.db_models import User as db_user, Tournament as db_tournament, user_tournaments as db_user_tournaments
+from app.models.models import TournamentPage, CompactTournamentList
+from app.utils.pagination import paginate_tournaments, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.utils.serialization import model_response
+
+router = APIRouter()
+
+
+@router.get('/tournaments', response_model=Union[TournamentPage, CompactTournamentList])
+async def list_tournaments(cursor: Optional[str] = None,
+                           limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                           name_prefix: Optional[str] = None,
+                           organizer: Optional[str] = None,
+                           start_from: Optional[date] = None,
+                           start_to: Optional[date] = None,
+                           end_from: Optional[date] = None,
+                           end_to: Optional[date] = None,
+                           deadline_from: Optional[datetime] = None,
+                           deadline_to: Optional[datetime] = None,
+                           compact: bool = False,
+                           db: AsyncSession = Depends(get_async_db)):
+    # Tournaments still being provisioned have no sheet or form yet, so they aren't listed
+    query = select(db_tournament).where(db_tournament.status == 'ready')
+
+    if name_prefix:
+        query = query.where(db_tournament.name.startswith(name_prefix, autoescape=True))
+    if organizer:
+        query = query.where(db_tournament.id.in_(
+            select(db_user_tournaments.c.tournament_id)
+            .join(db_user, db_user.id == db_user_tournaments.c.user_id)
+            .where(db_user.username == organizer)
+        ))
+    if start_from:
+        query = query.where(db_tournament.start_date >= start_from)
+    if start_to:
+        query = query.where(db_tournament.start_date <= start_to)
+    if end_from:
+        query = query.where(db_tournament.end_date >= end_from)
+    if end_to:
+        query = query.where(db_tournament.end_date <= end_to)
+    if deadline_from:
+        query = query.where(db_tournament.sign_up_deadline >= deadline_from)
+    if deadline_to:
+        query = query.where(db_tournament.sign_up_deadline <= deadline_to)
+
+    return model_response(await paginate_tournaments(db, query, cursor, limit, compact))
@@ -1,71 +1,213 @@
+import asyncio
+from typing import List
+
 from fastapi import APIRouter, HTTPException, Depends, status
 from googleapiclient.errors import HttpError
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.token import oauth2_scheme
-from app.db.database import get_database_session
+from app.db.database import get_async_db
 from app.models.db_models import User as db_user, Tournament as db_tournament, user_tournaments as db_user_tournaments
+from app.models.models import OrganizerBatchRequest, OrganizerBatchResult
+from app.utils.cache import response_cache, tournament_cache_key, user_profile_cache_keys
 from app.utils.get_user import get_current_user
-from app.utils.google_services import get_google_creds, set_sheet_permissions, set_form_permissions
+from app.utils.google_services import get_google_creds, grant_permissions, user_write_permission, file_id_from_link
+from app.utils.response_sync import sync_tournament_responses
 
 router = APIRouter()
 
-@router.post('/tournament/{tournament_id}/add/{username}')
-async def add_organizer(tournament_id: int, username: str, token: str = Depends(oauth2_scheme)):
-    with get_database_session() as db:
-        # Get the current user
-        current_user = get_current_user(token)
 
-        # Check if the current user is an organizer of the tournament
-        tournament = db.query(db_tournament).filter(db_tournament.id == tournament_id).first()
-        if not tournament:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found")
+async def insert_organizers(db: AsyncSession, tournament_id: int, users):
+    """
+    Add ``users`` as organizers with a single insert and return the ones actually added. Users another
+    request made organizers since they were checked are left out instead of failing the whole insert.
+
+    :param users: Rows with an ``id``; not ORM objects, which a rollback would expire
+    """
+    while users:
+        try:
+            await db.execute(db_user_tournaments.insert(), [
+                {'user_id': user.id, 'tournament_id': tournament_id} for user in users
+            ])
+            await db.commit()
+            return users
+        except IntegrityError:
+            await db.rollback()
+            organizer_ids = set((await db.execute(
+                select(db_user_tournaments.c.user_id).where(db_user_tournaments.c.tournament_id == tournament_id)
+            )).scalars().all())
+            remaining = [user for user in users if user.id not in organizer_ids]
+            if len(remaining) == len(users):
+                # Not a concurrent add, e.g. a user deleted in the meantime
+                raise
+            users = remaining
+    return users
+
 
-        is_organizer = db.query(db_user_tournaments).filter(
+async def is_organizer(db: AsyncSession, tournament_id: int, user_id: int):
+    row = (await db.execute(
+        select(db_user_tournaments).where(
             db_user_tournaments.c.tournament_id == tournament_id,
-            db_user_tournaments.c.user_id == current_user.id
-        ).first()
+            db_user_tournaments.c.user_id == user_id
+        )
+    )).first()
+    return row is not None
 
-        if not is_organizer:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not an organizer of this tournament")
 
-        # Get the user to be added as organizer
-        new_organizer = db.query(db_user).filter(db_user.username == username).first()
-        if not new_organizer:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+async def get_organized_tournament(db: AsyncSession, tournament_id: int, user_id: int):
+    tournament = await db.get(db_tournament, tournament_id)
+    if not tournament:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found")
 
-        # Check if the user is already an organizer
-        already_organizer = db.query(db_user_tournaments).filter(
-            db_user_tournaments.c.tournament_id == tournament_id,
-            db_user_tournaments.c.user_id == new_organizer.id
-        ).first()
+    if not await is_organizer(db, tournament_id, user_id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not an organizer of this tournament")
+    return tournament
 
-        if already_organizer:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User is already an organizer")
 
-        # Add the user to the user_tournaments table
-        new_user_tournament = db_user_tournaments.insert().values(
-            user_id=new_organizer.id,
-            tournament_id=tournament_id
-        )
-        db.execute(new_user_tournament)
-        db.commit()
+@router.post('/tournament/{tournament_id}/add/{username}')
+async def add_organizer(tournament_id: int, username: str, token: str = Depends(oauth2_scheme),
+                        db: AsyncSession = Depends(get_async_db)):
+    # Get the current user
+    current_user = await get_current_user(token)
 
-        try:
-            secret_name = 'google-sheets-key'  # Secret name in AWS Secrets Manager
-            region_name = 'us-west-2'  # AWS region where your secret is stored
-            google_creds = get_google_creds(secret_name, region_name)
+    # Check if the current user is an organizer of the tournament
+    tournament = await get_organized_tournament(db, tournament_id, current_user.id)
+    if tournament.status != 'ready':
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Tournament is not provisioned yet")
+
+    # Get the user to be added as organizer
+    new_organizer = (await db.execute(select(db_user).where(db_user.username == username))).scalars().first()
+    if not new_organizer:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+    # Check if the user is already an organizer
+    if await is_organizer(db, tournament_id, new_organizer.id):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User is already an organizer")
+
+    # Add the user to the user_tournaments table
+    new_user_tournament = db_user_tournaments.insert().values(
+        user_id=new_organizer.id,
+        tournament_id=tournament_id
+    )
+    await db.execute(new_user_tournament)
+    await db.commit()
+
+    # The tournament page and every organizer's profile list the organizers
+    organizer_usernames = (await db.execute(
+        select(db_user.username).join(db_user_tournaments, db_user_tournaments.c.user_id == db_user.id)
+        .where(db_user_tournaments.c.tournament_id == tournament_id)
+    )).scalars().all()
+    await response_cache.invalidate(tournament_cache_key(tournament.id, tournament.name),
+                                    *user_profile_cache_keys(*organizer_usernames))
+
+    try:
+        secret_name = 'google-sheets-key'  # Secret name in AWS Secrets Manager
+        region_name = 'us-west-2'  # AWS region where your secret is stored
+        google_creds = await asyncio.to_thread(get_google_creds, secret_name, region_name)
 
-            # Extract fileId from sheets_link and form_link
-            sheet_file_id = tournament.sheets_link.split('/d/')[1].split('/')[0]
-            form_file_id = tournament.form_link.split('/d/')[1].split('/')[0]
+        # Extract fileId from sheets_link and form_link
+        sheet_file_id = file_id_from_link(tournament.sheets_link)
+        form_file_id = file_id_from_link(tournament.form_link)
 
-            set_sheet_permissions(sheet_file_id, google_creds, new_organizer.email)
-            set_form_permissions(form_file_id, google_creds, new_organizer.email)
+        # Both editor grants go out as one Drive batch request from a worker thread
+        await asyncio.to_thread(grant_permissions, [
+            (sheet_file_id, user_write_permission(new_organizer.email)),
+            (form_file_id, user_write_permission(new_organizer.email)),
+        ], google_creds)
+    except HttpError as error:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail=f"Error granting Google Sheet/Form access: {error}")
+
+    return {
+        "message": f"User '{username}' added as organizer successfully and granted editor access to the Google Sheet and Form"}
+
+
+@router.post('/tournament/{tournament_id}/organizers/batch', response_model=List[OrganizerBatchResult])
+async def add_organizers_batch(tournament_id: int, request: OrganizerBatchRequest, token: str = Depends(oauth2_scheme),
+                               db: AsyncSession = Depends(get_async_db)):
+    current_user = await get_current_user(token)
+    tournament = await get_organized_tournament(db, tournament_id, current_user.id)
+    if tournament.status != 'ready':
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Tournament is not provisioned yet")
+
+    # Resolve every username and the existing organizers with two queries
+    usernames = list(dict.fromkeys(request.usernames))
+    users = {user.username: user for user in (await db.execute(
+        select(db_user.id, db_user.username, db_user.email).where(db_user.username.in_(usernames))
+    )).all()}
+    current_organizers = (await db.execute(
+        select(db_user.id, db_user.username).join(db_user_tournaments, db_user_tournaments.c.user_id == db_user.id)
+        .where(db_user_tournaments.c.tournament_id == tournament_id)
+    )).all()
+    organizer_ids = {organizer.id for organizer in current_organizers}
+
+    results = {}
+    new_organizers = []
+    for username in usernames:
+        user = users.get(username)
+        if not user:
+            results[username] = OrganizerBatchResult(username=username, status='not_found')
+        elif user.id in organizer_ids:
+            results[username] = OrganizerBatchResult(username=username, status='already_organizer')
+        else:
+            new_organizers.append(user)
+
+    if new_organizers:
+        # Read before the insert: rolling back a conflicting insert expires the tournament
+        tournament_key = tournament_cache_key(tournament.id, tournament.name)
+        sheet_file_id = file_id_from_link(tournament.sheets_link)
+        form_file_id = file_id_from_link(tournament.form_link)
+
+        added = await insert_organizers(db, tournament_id, new_organizers)
+        added_ids = {user.id for user in added}
+        for user in new_organizers:
+            if user.id not in added_ids:
+                results[user.username] = OrganizerBatchResult(username=user.username, status='already_organizer')
+        new_organizers = added
+
+    if new_organizers:
+        try:
+            google_creds = await asyncio.to_thread(get_google_creds, 'google-sheets-key', 'us-west-2')
+            # All sheet and form grants go out in as few Drive batch requests as possible
+            await asyncio.to_thread(grant_permissions, [
+                grant
+                for user in new_organizers
+                for grant in ((sheet_file_id, user_write_permission(user.email)),
+                              (form_file_id, user_write_permission(user.email)))
+            ], google_creds)
+            for user in new_organizers:
+                results[user.username] = OrganizerBatchResult(username=user.username, status='added')
         except HttpError as error:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail=f"Error granting Google Sheet/Form access: {error}")
+            for user in new_organizers:
+                results[user.username] = OrganizerBatchResult(
+                    username=user.username, status='failed',
+                    error=f"Added as organizer but granting Google Sheet/Form access failed: {error}")
+
+        # The tournament page and every organizer's profile list the organizers
+        await response_cache.invalidate(
+            tournament_key,
+            *user_profile_cache_keys(*(organizer.username for organizer in current_organizers)),
+            *user_profile_cache_keys(*(user.username for user in new_organizers)),
+        )
+
+    return [results[username] for username in usernames]
+
+
+@router.post('/tournament/{tournament_id}/sync')
+async def sync_responses(tournament_id: int, token: str = Depends(oauth2_scheme),
+                         db: AsyncSession = Depends(get_async_db)):
+    current_user = await get_current_user(token)
+    await get_organized_tournament(db, tournament_id, current_user.id)
 
-        return {
-            "message": f"User '{username}' added as organizer successfully and granted editor access to the Google Sheet and Form"}
+    try:
+        # The sync talks to Google and the DB from a worker thread with a sync session
+        result = await asyncio.to_thread(sync_tournament_responses, tournament_id)
+    except HttpError as error:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail=f"Error syncing form responses: {error}")
 
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Tournament is not provisioned yet")
+    return result
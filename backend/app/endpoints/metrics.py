@@ -0,0 +1,31 @@
+from fastapi import APIRouter
+from starlette.responses import PlainTextResponse
+
+from app.core.metrics import render_metrics
+from app.utils.google_clients import google_api_metrics
+
+router = APIRouter()
+
+GOOGLE_API_COUNTERS = {
+    'calls': ('google_api_calls_total', 'Google API call attempts', 'counter'),
+    'errors': ('google_api_errors_total', 'Google API call attempts that failed', 'counter'),
+    'retries': ('google_api_retries_total', 'Google API call attempts that were retried', 'counter'),
+    'seconds': ('google_api_seconds_total', 'Time spent in Google API calls', 'counter'),
+    'throttled_seconds': ('google_api_throttled_seconds_total', 'Time spent waiting for the rate limiter', 'counter'),
+}
+
+
+def render_google_api_metrics():
+    snapshot = google_api_metrics.snapshot()
+    lines = []
+    for field, (name, description, metric_type) in GOOGLE_API_COUNTERS.items():
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} {metric_type}']
+        lines += [f'{name}{{call="{call}"}} {stats[field]}' for call, stats in sorted(snapshot.items())]
+    return '\n'.join(lines)
+
+
+@router.get('/metrics', include_in_schema=False)
+async def metrics():
+    # Metrics are per process; with several workers each one is scraped separately
+    return PlainTextResponse(render_metrics(render_google_api_metrics()),
+                             media_type='text/plain; version=0.0.4; charset=utf-8')
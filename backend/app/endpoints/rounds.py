@@ -0,0 +1,179 @@
+from collections import defaultdict
+
+import numpy as np
+from fastapi import APIRouter, HTTPException, Depends, Request, status
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.token import oauth2_scheme
+from app.db.database import get_async_db
+from app.endpoints.manage_tournament import get_organized_tournament
+from app.models.db_models import Tournament as db_tournament, Signup as db_signup, Placement as db_placement
+from app.models.models import RoundCreateRequest, Round, Lobby, LobbyPlayer, RoundResultsRequest, Standing, Standings
+from app.utils.cache import response_cache, standings_cache_key, cached_json_response, encode_json
+from app.utils.get_user import get_current_user
+from app.utils.standings import SEEDING_METHODS, placement_matrix, compute_standings, assign_lobbies
+
+router = APIRouter()
+
+
+async def load_players(db: AsyncSession, tournament_id: int):
+    """Signups of a tournament in id order; row i of every placement matrix is players[i]."""
+    return (await db.execute(
+        select(db_signup.id, db_signup.game_name, db_signup.tag_line)
+        .where(db_signup.tournament_id == tournament_id).order_by(db_signup.id)
+    )).all()
+
+
+async def load_placement_matrix(db: AsyncSession, tournament_id: int, players):
+    """
+    Read every result of a tournament into a players x rounds array.
+
+    :return: Tuple of (placements, rounds, complete); ``complete`` is False when the latest round
+        still has unreported placements
+    """
+    results = (await db.execute(
+        # Unreported placements come back as 0, the matrix's "no result" value
+        select(db_placement.signup_id, db_placement.round_number, func.coalesce(db_placement.placement, 0))
+        .where(db_placement.tournament_id == tournament_id)
+    )).all()
+    player_ids = np.fromiter((player.id for player in players), dtype=np.int64, count=len(players))
+    if not results:
+        return np.zeros((len(players), 0), dtype=np.int8), 0, True
+
+    signup_ids, round_numbers, placements = np.array(list(map(tuple, results)), dtype=np.int64).T
+    rounds = int(round_numbers.max())
+    complete = bool((placements[round_numbers == rounds] > 0).all())
+    return placement_matrix(player_ids, signup_ids, round_numbers, placements, rounds), rounds, complete
+
+
+async def load_round(db: AsyncSession, tournament_id: int, round_number: int):
+    rows = (await db.execute(
+        select(db_placement.id, db_placement.signup_id, db_placement.lobby, db_placement.placement,
+               db_signup.game_name, db_signup.tag_line)
+        .join(db_signup, db_signup.id == db_placement.signup_id)
+        .where(db_placement.tournament_id == tournament_id, db_placement.round_number == round_number)
+        .order_by(db_placement.lobby, db_placement.placement, db_placement.signup_id)
+    )).all()
+    if not rows:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Round not found")
+    return rows
+
+
+def build_round(round_number: int, rows):
+    lobbies = defaultdict(list)
+    for row in rows:
+        lobbies[row.lobby].append(LobbyPlayer(signup_id=row.signup_id, game_name=row.game_name,
+                                              tag_line=row.tag_line, placement=row.placement))
+    return Round(
+        round_number=round_number,
+        complete=all(row.placement is not None for row in rows),
+        lobbies=[Lobby(lobby=lobby, players=players) for lobby, players in sorted(lobbies.items())],
+    )
+
+
+@router.post('/tournament/{tournament_id}/rounds', response_model=Round)
+async def create_round(tournament_id: int, request: RoundCreateRequest, token: str = Depends(oauth2_scheme),
+                       db: AsyncSession = Depends(get_async_db)):
+    if request.method not in SEEDING_METHODS:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail=f"Seeding method must be one of {', '.join(SEEDING_METHODS)}")
+    current_user = await get_current_user(token)
+    await get_organized_tournament(db, tournament_id, current_user.id)
+
+    players = await load_players(db, tournament_id)
+    if len(players) < 2:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Not enough signups to start a round")
+
+    placements, rounds, complete = await load_placement_matrix(db, tournament_id, players)
+    if not complete:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Round {rounds} still has missing results")
+
+    # The first round is seeded in sign-up order, later ones by the current standings
+    order = compute_standings(placements)['order'] if rounds else np.arange(len(players))
+    lobby = assign_lobbies(order, request.method)
+
+    round_number = rounds + 1
+    try:
+        await db.execute(insert(db_placement), [
+            {'tournament_id': tournament_id, 'signup_id': player.id, 'round_number': round_number,
+             'lobby': int(player_lobby) + 1}
+            for player, player_lobby in zip(players, lobby)
+        ])
+        await db.commit()
+    except IntegrityError:
+        # Another request created this round first
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Round {round_number} already exists")
+
+    await response_cache.invalidate(standings_cache_key(tournament_id))
+    return build_round(round_number, await load_round(db, tournament_id, round_number))
+
+
+@router.get('/tournament/{tournament_id}/rounds/{round_number}', response_model=Round)
+async def get_round(tournament_id: int, round_number: int, db: AsyncSession = Depends(get_async_db)):
+    return build_round(round_number, await load_round(db, tournament_id, round_number))
+
+
+@router.post('/tournament/{tournament_id}/rounds/{round_number}/results', response_model=Round)
+async def report_round_results(tournament_id: int, round_number: int, request: RoundResultsRequest,
+                               token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    current_user = await get_current_user(token)
+    await get_organized_tournament(db, tournament_id, current_user.id)
+    rows = await load_round(db, tournament_id, round_number)
+
+    lobbies = defaultdict(dict)
+    for row in rows:
+        lobbies[row.lobby][row.signup_id] = row.id
+
+    # Every reported lobby must list each of its players exactly once
+    errors = []
+    for result in request.results:
+        players = lobbies.get(result.lobby)
+        if players is None:
+            errors.append({'lobby': result.lobby, 'error': "Lobby not found"})
+        elif sorted(result.finishing_order) != sorted(players):
+            errors.append({'lobby': result.lobby, 'error': "Finishing order must list every player of the lobby once"})
+    if errors:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=errors)
+
+    # ORM bulk UPDATE by primary key, executed as a single executemany
+    await db.execute(update(db_placement), [
+        {'id': lobbies[result.lobby][signup_id], 'placement': placement}
+        for result in request.results
+        for placement, signup_id in enumerate(result.finishing_order, start=1)
+    ])
+    await db.commit()
+
+    await response_cache.invalidate(standings_cache_key(tournament_id))
+    return build_round(round_number, await load_round(db, tournament_id, round_number))
+
+
+async def load_standings(db: AsyncSession, tournament_id: int) -> Standings:
+    players = await load_players(db, tournament_id)
+    placements, rounds, _ = await load_placement_matrix(db, tournament_id, players)
+    standings = compute_standings(placements)
+
+    items = []
+    for rank, row in enumerate(standings['order'].tolist(), start=1):
+        player = players[row]
+        last_placement = int(standings['last_placement'][row])
+        items.append(Standing(
+            rank=rank, signup_id=player.id, game_name=player.game_name, tag_line=player.tag_line,
+            points=int(standings['points'][row]), top4=int(standings['top4'][row]),
+            firsts=int(standings['firsts'][row]), last_placement=last_placement or None,
+            placements=[placement or None for placement in placements[row].tolist()],
+        ))
+    return Standings(rounds=rounds, items=items)
+
+
+@router.get('/tournament/{tournament_id}/standings', response_model=Standings)
+async def get_standings(tournament_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    cache_key = standings_cache_key(tournament_id)
+    cached = await response_cache.get(cache_key)
+    if cached is None:
+        if await db.get(db_tournament, tournament_id) is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found")
+        cached = await response_cache.set(cache_key, encode_json(await load_standings(db, tournament_id)))
+    return cached_json_response(request, cached)
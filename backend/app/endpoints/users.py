@@ -1,38 +1,61 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from sqlalchemy.orm import Session
+from typing import Optional, Union
 
-from app.db.database import get_database_session
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.db.database import get_async_db
 from app.models.db_models import User as db_user, Tournament as db_tournament, user_tournaments as db_user_tournaments
-from app.models.models import UserProfile, Tournament
+from app.models.models import UserProfile, Tournament, TournamentPage, CompactUserProfile, CompactTournamentList
+from app.utils.cache import response_cache, user_profile_cache_key, cached_json_response, encode_json
+from app.utils.pagination import paginate_tournaments, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.utils.serialization import model_response
 
 router = APIRouter()
 
 
-@router.get('/users/{username}', response_model=UserProfile)
-async def get_user_profile(username: str):
-    with get_database_session() as db:
-        user = db.query(db_user).filter(db_user.username == username).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-
-        user_tournament_entries = db.query(db_user_tournaments).filter(db_user_tournaments.c.user_id == user.id).all()
-        tournaments = []
-
-        for entry in user_tournament_entries:
-            tournament = db.query(db_tournament).filter(db_tournament.id == entry.tournament_id).first()
-            organizers = db.query(db_user).join(db_tournament.organizers).filter(
-                db_tournament.id == tournament.id).all()
-            organizer_usernames = [organizer.username for organizer in organizers]
-            tournaments.append(Tournament(
-                id=tournament.id,
-                name=tournament.name,
-                sheets_link=tournament.sheets_link,
-                form_link=tournament.form_link,
-                organizers=organizer_usernames
-            ))
-
-        return UserProfile(
-            username=user.username,
-            email=user.email,
-            tournaments=tournaments
-        )
+@router.get('/users/{username}', response_model=Union[UserProfile, CompactUserProfile])
+async def get_user_profile(username: str, request: Request, compact: bool = False,
+                           db: AsyncSession = Depends(get_async_db)):
+    """Pass ``compact=true`` to get the tournaments as ``columns`` and ``rows`` instead of one object each."""
+    cache_key = user_profile_cache_key(username, compact)
+    cached = await response_cache.get(cache_key)
+    if cached is None:
+        profile = await load_user_profile(db, username)
+        if compact:
+            profile = CompactUserProfile.from_profile(profile)
+        cached = await response_cache.set(cache_key, encode_json(profile))
+    return cached_json_response(request, cached)
+
+
+async def load_user_profile(db: AsyncSession, username: str) -> UserProfile:
+    # Two queries in total: the user, then all of their tournaments joined with every organizer
+    user = (await db.execute(
+        select(db_user).options(
+            selectinload(db_user.tournaments).joinedload(db_tournament.organizers)
+        ).where(db_user.username == username)
+    )).scalars().first()
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+    # Straight from the ORM objects without validating; FastAPI doesn't revalidate cached responses either
+    return UserProfile.construct_trusted(
+        username=user.username,
+        email=user.email,
+        tournaments=[Tournament.from_db(tournament) for tournament in user.tournaments]
+    )
+
+
+@router.get('/users/{username}/tournaments', response_model=Union[TournamentPage, CompactTournamentList])
+async def get_user_tournaments(username: str, cursor: Optional[str] = None,
+                               limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                               compact: bool = False, db: AsyncSession = Depends(get_async_db)):
+    user_id = (await db.execute(select(db_user.id).where(db_user.username == username))).scalar()
+    if user_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+    query = select(db_tournament).join(
+        db_user_tournaments, db_user_tournaments.c.tournament_id == db_tournament.id
+    ).where(db_user_tournaments.c.user_id == user_id)
+    return model_response(await paginate_tournaments(db, query, cursor, limit, compact))
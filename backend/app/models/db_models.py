@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine, Column, Integer, String, ForeignKey, Table, Date, DateTime
+from sqlalchemy import create_engine, Column, Integer, String, ForeignKey, Table, Date, DateTime, Index, Boolean, \
+    UniqueConstraint, false
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
 
@@ -7,7 +8,9 @@ Base = declarative_base()
 # Association table for the many-to-many relationship between users and tournaments
 user_tournaments = Table('user_tournaments', Base.metadata,
                          Column('user_id', Integer, ForeignKey('users.id'), primary_key=True),
-                         Column('tournament_id', Integer, ForeignKey('tournaments.id'), primary_key=True)
+                         Column('tournament_id', Integer, ForeignKey('tournaments.id'), primary_key=True),
+                         # The primary key covers lookups by user_id; this covers lookups by tournament_id
+                         Index('ix_user_tournaments_tournament_id', 'tournament_id')
                          )
 
 
@@ -15,9 +18,9 @@ class User(Base):
     __tablename__ = 'users'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    username = Column(String, nullable=False)
+    username = Column(String, nullable=False, unique=True, index=True)
     password = Column(String, nullable=False)
-    email = Column(String, nullable=False)
+    email = Column(String, nullable=False, unique=True, index=True)
 
     tournaments = relationship('Tournament', secondary=user_tournaments, back_populates='organizers')
 
@@ -26,11 +29,79 @@ class Tournament(Base):
     __tablename__ = 'tournaments'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    name = Column(String, nullable=False)
-    sheets_link = Column(String, nullable=False)
-    form_link = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
+    # Links are empty while the Google files are still being provisioned in the background
+    sheets_link = Column(String, nullable=True)
+    form_link = Column(String, nullable=True)
     sign_up_deadline = Column(DateTime, nullable=False)
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
 
+    # Provisioning state: 'provisioning', 'ready' or 'failed'
+    status = Column(String, nullable=False, default='ready', server_default='ready')
+    provisioning_step = Column(String, nullable=True)
+    provisioning_attempts = Column(Integer, nullable=False, default=0, server_default='0')
+    provisioning_error = Column(String, nullable=True)
+    # Lease held by the worker running the provisioning job, so several workers never run it at once
+    provisioning_lease_owner = Column(String, nullable=True)
+    provisioning_lease_expires_at = Column(DateTime, nullable=True)
+    # Client supplied key so retried create requests don't provision a second tournament
+    idempotency_key = Column(String, nullable=True, unique=True, index=True)
+
+    # High-water mark of the form-response sync: lastSubmittedTime (RFC3339) of the newest synced response
+    responses_synced_at = Column(String, nullable=True)
+
+    # Set once the form stopped accepting responses at the sign-up deadline and the final sync ran
+    signups_closed_at = Column(DateTime, nullable=True)
+    # Lease held by the worker closing sign-ups, so only one of several workers does it
+    close_lease_owner = Column(String, nullable=True)
+    close_lease_expires_at = Column(DateTime, nullable=True)
+
     organizers = relationship('User', secondary=user_tournaments, back_populates='tournaments')
+
+    __table_args__ = (
+        # Keyset pagination of GET /tournaments orders by (start_date, id)
+        Index('ix_tournaments_start_date_id', 'start_date', 'id'),
+        Index('ix_tournaments_end_date', 'end_date'),
+        Index('ix_tournaments_sign_up_deadline', 'sign_up_deadline'),
+        # Lets name_prefix (LIKE 'abc%') use an index regardless of the collation; PostgreSQL only, like migration 0004
+        Index('ix_tournaments_name_pattern', 'name', postgresql_ops={'name': 'text_pattern_ops'})
+        .ddl_if(dialect='postgresql'),
+    )
+
+
+class Signup(Base):
+    __tablename__ = 'signups'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    tournament_id = Column(Integer, ForeignKey('tournaments.id'), nullable=False)
+    game_name = Column(String, nullable=False)
+    tag_line = Column(String, nullable=False)
+    # lastSubmittedTime of the form response, in UTC
+    submitted_at = Column(DateTime, nullable=True)
+    response_id = Column(String, nullable=True)
+    # Whether the row has been copied to the tournament's Google Sheet
+    mirrored = Column(Boolean, nullable=False, default=False, server_default=false())
+
+    __table_args__ = (
+        # A player can only sign up once per tournament; also serves lookups by tournament_id
+        UniqueConstraint('tournament_id', 'game_name', 'tag_line', name='uq_signups_tournament_player'),
+        Index('ix_signups_tournament_id_id', 'tournament_id', 'id'),
+    )
+
+
+class Placement(Base):
+    __tablename__ = 'placements'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    tournament_id = Column(Integer, ForeignKey('tournaments.id'), nullable=False)
+    signup_id = Column(Integer, ForeignKey('signups.id'), nullable=False)
+    round_number = Column(Integer, nullable=False)
+    # Lobby (1-based) the player was seeded into for the round
+    lobby = Column(Integer, nullable=False)
+    # 1-8, empty until the lobby's results are reported
+    placement = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint('tournament_id', 'round_number', 'signup_id', name='uq_placements_round_player'),
+    )
@@ -1,20 +1,100 @@
 from datetime import date, datetime
-from typing import List
+from typing import List, Optional
+
+import pydantic
 from pydantic import BaseModel
 
+PYDANTIC_V2 = int(pydantic.VERSION.split('.')[0]) >= 2
+
+
+class OrmModel(BaseModel):
+    """
+    Base of models read from ORM objects. ``from_attributes`` validates the object's attributes;
+    ``from_db`` trusts the types the database returned and skips validation entirely.
+    """
+
+    if PYDANTIC_V2:
+        model_config = {'from_attributes': True}
+    else:
+        class Config:
+            orm_mode = True
+
+    @classmethod
+    def field_names(cls):
+        return list(cls.model_fields if PYDANTIC_V2 else cls.__fields__)
+
+    @classmethod
+    def from_attributes(cls, obj):
+        return cls.model_validate(obj) if PYDANTIC_V2 else cls.from_orm(obj)
+
+    @classmethod
+    def construct_trusted(cls, **values):
+        return cls.model_construct(**values) if PYDANTIC_V2 else cls.construct(**values)
+
+    @classmethod
+    def from_db(cls, obj):
+        return cls.construct_trusted(**{name: getattr(obj, name) for name in cls.field_names()})
 
-class Tournament(BaseModel):
+
+class Tournament(OrmModel):
     id: int
     name: str
-    sheets_link: str
-    form_link: str
+    sheets_link: Optional[str] = None
+    form_link: Optional[str] = None
     sign_up_deadline: datetime
     start_date: date
     end_date: date
     organizers: List[str]
 
-    class Config:
-        orm_mode: True
+    @classmethod
+    def from_db(cls, tournament):
+        # organizers must be loaded; the model only keeps their usernames
+        return cls.construct_trusted(
+            id=tournament.id,
+            name=tournament.name,
+            sheets_link=tournament.sheets_link,
+            form_link=tournament.form_link,
+            sign_up_deadline=tournament.sign_up_deadline,
+            start_date=tournament.start_date,
+            end_date=tournament.end_date,
+            organizers=[organizer.username for organizer in tournament.organizers],
+        )
+
+
+class TournamentPage(OrmModel):
+    items: List[Tournament]
+    # Pass back as ?cursor= to fetch the next page; None on the last page
+    next_cursor: Optional[str] = None
+
+
+class CompactTournamentList(OrmModel):
+    # Tournaments as rows of values in the order of ``columns``, so field names aren't repeated per tournament
+    columns: List[str]
+    rows: List[list]
+    # Pass back as ?cursor= to fetch the next page; None on the last page or outside paginated lists
+    next_cursor: Optional[str] = None
+
+    @classmethod
+    def from_tournaments(cls, tournaments: List[Tournament], next_cursor: Optional[str] = None):
+        columns = Tournament.field_names()
+        return cls.construct_trusted(
+            columns=columns,
+            rows=[[getattr(tournament, column) for column in columns] for tournament in tournaments],
+            next_cursor=next_cursor,
+        )
+
+
+class Signup(OrmModel):
+    id: int
+    game_name: str
+    tag_line: str
+    submitted_at: Optional[datetime] = None
+
+
+class SignupPage(OrmModel):
+    items: List[Signup]
+    # Pass back as ?cursor= to fetch the next page; None on the last page
+    next_cursor: Optional[int] = None
 
 
 class TournamentCreateRequest(BaseModel):
@@ -24,25 +104,125 @@ class TournamentCreateRequest(BaseModel):
     end_date: date
 
 
-class User(BaseModel):
+class TournamentBatchCreateRequest(BaseModel):
+    tournaments: List[TournamentCreateRequest]
+
+
+class TournamentBatchResult(BaseModel):
+    index: int
+    name: str
+    status: str  # 'created' or 'failed'
+    tournament_id: Optional[int] = None
+    sheet_id: Optional[str] = None
+    form_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class OrganizerBatchRequest(BaseModel):
+    usernames: List[str]
+
+
+class OrganizerBatchResult(BaseModel):
+    username: str
+    status: str  # 'added', 'already_organizer', 'not_found' or 'failed'
+    error: Optional[str] = None
+
+
+class TournamentStatus(BaseModel):
+    id: int
+    status: str
+    step: Optional[str] = None
+    attempts: int
+    error: Optional[str] = None
+    sheets_link: Optional[str] = None
+    form_link: Optional[str] = None
+    signups_closed_at: Optional[datetime] = None
+
+
+class User(OrmModel):
     id: int
     username: str
     password: str
     email: str
     tournaments: List[int]  # List of tournament IDs
 
-    class Config:
-        orm_mode: True
+
+class TokenUser(BaseModel):
+    id: int
+    username: str
+    email: str
 
 
-class UserProfile(BaseModel):
+class UserProfile(OrmModel):
     username: str
     email: str
     tournaments: List[Tournament]
 
 
+class CompactUserProfile(OrmModel):
+    username: str
+    email: str
+    tournaments: CompactTournamentList
+
+    @classmethod
+    def from_profile(cls, profile: UserProfile):
+        return cls.construct_trusted(username=profile.username, email=profile.email,
+                                     tournaments=CompactTournamentList.from_tournaments(profile.tournaments))
+
+
 class UserRegisterRequest(BaseModel):
     username: str
     password: str
     email: str
 
+
+
+class RoundCreateRequest(BaseModel):
+    # 'snake' spreads seeds evenly over the lobbies, 'swiss' puts players of similar standing together
+    method: str = 'snake'
+
+
+class LobbyPlayer(BaseModel):
+    signup_id: int
+    game_name: str
+    tag_line: str
+    placement: Optional[int] = None
+
+
+class Lobby(BaseModel):
+    lobby: int
+    players: List[LobbyPlayer]
+
+
+class Round(BaseModel):
+    round_number: int
+    complete: bool
+    lobbies: List[Lobby]
+
+
+class LobbyResult(BaseModel):
+    lobby: int
+    # Signup ids of the lobby's players from first to last place
+    finishing_order: List[int]
+
+
+class RoundResultsRequest(BaseModel):
+    results: List[LobbyResult]
+
+
+class Standing(BaseModel):
+    rank: int
+    signup_id: int
+    game_name: str
+    tag_line: str
+    points: int
+    top4: int
+    firsts: int
+    last_placement: Optional[int] = None
+    # Placement in each round, None where the player has no result
+    placements: List[Optional[int]]
+
+
+class Standings(BaseModel):
+    rounds: int
+    items: List[Standing]
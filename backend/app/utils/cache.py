@@ -0,0 +1,196 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from fastapi import Request, Response
+
+from app.utils.serialization import dumps
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after a time-to-live."""
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Backend for cached public responses: 'memory' (per process) or 'redis' (shared between workers)
+RESPONSE_CACHE_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND', 'memory')
+RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', '60'))
+RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', '4096'))
+# How long browsers and proxies may reuse a response without revalidating
+RESPONSE_CACHE_MAX_AGE = int(os.getenv('RESPONSE_CACHE_MAX_AGE', '30'))
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCacheBackend:
+    """In-process LRU backend; each worker keeps its own copy."""
+
+    def __init__(self, maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key):
+        return self._cache.get(key)
+
+    async def set(self, key, value, ttl):
+        self._cache.set(key, value, ttl=ttl)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self._cache.delete(key)
+
+
+class RedisCacheBackend:
+    """
+    Backend for any client with the redis.asyncio get/set(ex=)/delete interface, so a local
+    stand-in such as fakeredis can replace a real server.
+    """
+
+    def __init__(self, client, prefix='tft:'):
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key):
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key, value, ttl):
+        await self.client.set(self.prefix + key, value, ex=ttl)
+
+    async def delete(self, *keys):
+        if keys:
+            await self.client.delete(*(self.prefix + key for key in keys))
+
+
+def create_cache_backend(backend=RESPONSE_CACHE_BACKEND):
+    if backend == 'memory':
+        return MemoryCacheBackend()
+    if backend == 'redis':
+        import redis.asyncio
+
+        return RedisCacheBackend(redis.asyncio.from_url(REDIS_URL))
+    raise ValueError(f"Unknown response cache backend '{backend}'")
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+
+
+class ResponseCache:
+    """
+    Read-through cache of serialized JSON responses with their ETags.
+
+    Backend errors are logged and treated as misses, so a cache outage only costs latency.
+    """
+
+    def __init__(self, backend, ttl=RESPONSE_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+
+    async def get(self, key):
+        try:
+            value = await self.backend.get(key)
+        except Exception:
+            logger.warning("Response cache read failed for %s", key, exc_info=True)
+            return None
+        if value is None:
+            return None
+        etag, body = value.split(b'\n', 1)
+        return CachedResponse(body=body, etag=etag.decode())
+
+    async def set(self, key, body: bytes):
+        cached = CachedResponse(body=body, etag=f'"{hashlib.sha1(body).hexdigest()}"')
+        try:
+            await self.backend.set(key, cached.etag.encode() + b'\n' + body, self.ttl)
+        except Exception:
+            logger.warning("Response cache write failed for %s", key, exc_info=True)
+        return cached
+
+    async def invalidate(self, *keys):
+        try:
+            await self.backend.delete(*keys)
+        except Exception:
+            logger.warning("Response cache invalidation failed for %s", keys, exc_info=True)
+
+
+def tournament_cache_key(tournament_id, tournament_name):
+    return f"tournament:{tournament_id}:{tournament_name}"
+
+
+def user_profile_cache_key(username, compact=False):
+    return f"user:{username}:compact" if compact else f"user:{username}"
+
+
+def user_profile_cache_keys(*usernames):
+    # Every cached variant of the users' profiles, for invalidation
+    return [user_profile_cache_key(username, compact) for username in usernames for compact in (False, True)]
+
+
+def standings_cache_key(tournament_id):
+    return f"standings:{tournament_id}"
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    # Compare weakly: W/"abc" matches "abc"
+    candidates = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+    return etag in candidates
+
+
+def cached_json_response(request: Request, cached: CachedResponse, max_age=RESPONSE_CACHE_MAX_AGE):
+    headers = {'ETag': cached.etag, 'Cache-Control': f'public, max-age={max_age}'}
+    if etag_matches(request.headers.get('if-none-match'), cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type='application/json', headers=headers)
+
+
+def encode_json(model):
+    return dumps(model)
+
+
+response_cache = ResponseCache(create_cache_backend())
@@ -0,0 +1,204 @@
+import csv
+import io
+import json
+import os
+import zlib
+from datetime import date, datetime
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_, select
+
+from app.db.database import get_async_database_session
+from app.models.db_models import Signup as db_signup, Placement as db_placement
+
+# Rows read per query; each batch is encoded and sent before the next one is read, so memory stays flat
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '10000'))
+# Tournaments accepted by one multi-tournament export request
+EXPORT_MAX_TOURNAMENTS = int(os.getenv('EXPORT_MAX_TOURNAMENTS', '1000'))
+
+# Media type and file extension of each format
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+SIGNUP_COLUMNS = ('tournament_id', 'signup_id', 'game_name', 'tag_line', 'submitted_at')
+RESULT_COLUMNS = ('tournament_id', 'round_number', 'lobby', 'signup_id', 'game_name', 'tag_line', 'placement')
+
+
+async def signup_batches(tournament_id, batch_size):
+    # Keyset scan of ix_signups_tournament_id_id; a session per batch so no connection waits on a slow client
+    last_id = 0
+    while True:
+        async with get_async_database_session() as db:
+            rows = (await db.execute(
+                select(db_signup.tournament_id, db_signup.id, db_signup.game_name, db_signup.tag_line,
+                       db_signup.submitted_at)
+                .where(db_signup.tournament_id == tournament_id, db_signup.id > last_id)
+                .order_by(db_signup.id).limit(batch_size)
+            )).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        yield rows
+
+
+async def result_batches(tournament_id, batch_size):
+    # Keyset scan of uq_placements_round_player by (round_number, signup_id)
+    last_round, last_signup_id = 0, 0
+    while True:
+        async with get_async_database_session() as db:
+            rows = (await db.execute(
+                select(db_placement.tournament_id, db_placement.round_number, db_placement.lobby,
+                       db_placement.signup_id, db_signup.game_name, db_signup.tag_line, db_placement.placement)
+                .join(db_signup, db_signup.id == db_placement.signup_id)
+                .where(db_placement.tournament_id == tournament_id, or_(
+                    db_placement.round_number > last_round,
+                    and_(db_placement.round_number == last_round, db_placement.signup_id > last_signup_id),
+                ))
+                .order_by(db_placement.round_number, db_placement.signup_id).limit(batch_size)
+            )).all()
+        if not rows:
+            return
+        last_round, last_signup_id = rows[-1].round_number, rows[-1].signup_id
+        yield rows
+
+
+EXPORT_DATASETS = {
+    'signups': (SIGNUP_COLUMNS, signup_batches),
+    'results': (RESULT_COLUMNS, result_batches),
+}
+
+
+def validate_export(dataset, export_format):
+    if dataset not in EXPORT_DATASETS:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail=f"Dataset must be one of {', '.join(EXPORT_DATASETS)}")
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail=f"Format must be one of {', '.join(EXPORT_FORMATS)}")
+    if export_format == 'parquet':
+        require_pyarrow()
+
+
+def require_pyarrow():
+    # Optional dependency, only needed for Parquet exports
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED,
+                            detail="Parquet export needs pyarrow, which isn't installed")
+    return pyarrow, pyarrow.parquet
+
+
+async def export_batches(dataset, tournament_ids, batch_size=EXPORT_BATCH_SIZE):
+    _, batches = EXPORT_DATASETS[dataset]
+    for tournament_id in tournament_ids:
+        async for rows in batches(tournament_id, batch_size):
+            yield rows
+
+
+async def encode_csv(columns, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Only the header: nothing to export
+        yield buffer.getvalue().encode()
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+async def encode_ndjson(columns, batches):
+    async for rows in batches:
+        yield ''.join(
+            json.dumps(dict(zip(columns, row)), default=_json_default, separators=(',', ':')) + '\n' for row in rows
+        ).encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands out what was written since the last ``drain``."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _parquet_schema(pa, columns):
+    types = {
+        'tournament_id': pa.int64(), 'signup_id': pa.int64(), 'round_number': pa.int32(), 'lobby': pa.int32(),
+        'placement': pa.int8(), 'game_name': pa.string(), 'tag_line': pa.string(),
+        'submitted_at': pa.timestamp('us'),
+    }
+    return pa.schema([(column, types[column]) for column in columns])
+
+
+async def encode_parquet(columns, batches):
+    pa, pq = require_pyarrow()
+    schema = _parquet_schema(pa, columns)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    try:
+        # One row group per batch, written out before the next batch is read
+        async for rows in batches:
+            arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    # The footer is written on close
+    yield sink.drain()
+
+
+ENCODERS = {'csv': encode_csv, 'ndjson': encode_ndjson, 'parquet': encode_parquet}
+
+
+async def gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(dataset, export_format, tournament_ids, compress=False, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Encode the rows of ``dataset`` for every tournament, in order, as a stream of byte chunks.
+
+    Rows are read in keyset batches of ``batch_size`` and each batch is encoded before the next is
+    read, so memory use doesn't depend on the size of the export.
+
+    :param compress: Gzip the stream; Parquet is compressed per column already and should not be
+    """
+    columns, _ = EXPORT_DATASETS[dataset]
+    chunks = ENCODERS[export_format](columns, export_batches(dataset, tournament_ids, batch_size))
+    return gzip_chunks(chunks) if compress else chunks
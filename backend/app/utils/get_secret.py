@@ -1,31 +1,190 @@
 import json
-import boto3
-from botocore.exceptions import ClientError
+import os
+import re
+import threading
+import time
+
+from app.core.metrics import span
+
+# Backend used to resolve secrets: 'aws' (default), 'file' or 'env'
+SECRETS_BACKEND = os.getenv('SECRETS_BACKEND', 'aws')
+# JSON file mapping secret names to their key/value dictionaries, used by the 'file' backend
+SECRETS_FILE = os.getenv('SECRETS_FILE', 'secrets.json')
+# How long a fetched secret is served from memory before it has to be fetched again
+SECRETS_CACHE_TTL = float(os.getenv('SECRETS_CACHE_TTL', '300'))
+# How long before expiry a background refresh is started, so readers never wait on the backend
+SECRETS_REFRESH_AHEAD = float(os.getenv('SECRETS_REFRESH_AHEAD', '60'))
+
+
+def _parse_secret(raw):
+    if isinstance(raw, (bytes, bytearray)):
+        raw = raw.decode('utf-8')
+    if isinstance(raw, str):
+        return json.loads(raw)
+    return dict(raw)
+
+
+class AwsSecretsProvider:
+    """Fetches secrets from AWS Secrets Manager, reusing one client per region."""
+
+    def __init__(self):
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def _get_client(self, region_name):
+        client = self._clients.get(region_name)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(region_name)
+                if client is None:
+                    import boto3
+
+                    client = boto3.client('secretsmanager', region_name=region_name)
+                    self._clients[region_name] = client
+        return client
+
+    def fetch(self, secret_name, region_name):
+        # boto3 clients are thread-safe, so the pooled client is shared by all callers
+        response = self._get_client(region_name).get_secret_value(SecretId=secret_name)
+
+        # Decrypts secret using the associated KMS key.
+        if 'SecretString' in response:
+            return _parse_secret(response['SecretString'])
+        return _parse_secret(response['SecretBinary'])
+
+
+class FileSecretsProvider:
+    """Reads secrets from a local JSON file of the form {"secret-name": {...}}."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def fetch(self, secret_name, region_name):
+        with open(self.path) as f:
+            secrets = json.load(f)
+        if secret_name not in secrets:
+            raise KeyError(f"Secret '{secret_name}' not found in {self.path}")
+        return _parse_secret(secrets[secret_name])
+
+
+class EnvSecretsProvider:
+    """Reads secrets from environment variables, e.g. 'tft-tournament-keys' -> SECRET_TFT_TOURNAMENT_KEYS."""
+
+    prefix = 'SECRET_'
+
+    def env_var(self, secret_name):
+        return self.prefix + re.sub(r'[^A-Za-z0-9]', '_', secret_name).upper()
+
+    def fetch(self, secret_name, region_name):
+        name = self.env_var(secret_name)
+        raw = os.environ.get(name)
+        if raw is None:
+            raise KeyError(f"Secret '{secret_name}' not found in environment variable {name}")
+        return _parse_secret(raw)
+
+
+class SecretsCache:
+    """
+    Process-wide, thread-safe TTL cache in front of a secrets provider.
+
+    Entries are refreshed in a background thread once they are within ``refresh_ahead``
+    seconds of expiring, so only the very first lookup of a secret pays the backend latency.
+    """
+
+    def __init__(self, provider, ttl=SECRETS_CACHE_TTL, refresh_ahead=SECRETS_REFRESH_AHEAD):
+        self.provider = provider
+        self.ttl = ttl
+        self.refresh_ahead = min(refresh_ahead, ttl)
+        self._entries = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def get(self, secret_name, region_name):
+        key = (secret_name, region_name)
+        now = time.monotonic()
+        entry = self._entries.get(key)
+
+        if entry is None or now >= entry[1]:
+            return self._load(key)
+
+        value, expires_at = entry
+        if now >= expires_at - self.refresh_ahead:
+            self._refresh_in_background(key)
+        return value
+
+    def invalidate(self, secret_name=None, region_name=None):
+        with self._lock:
+            if secret_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop((secret_name, region_name), None)
+
+    def _load(self, key):
+        with span('secrets', key[0]):
+            value = self.provider.fetch(*key)
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+        return value
+
+    def _refresh_in_background(self, key):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._load(key)
+            except Exception:
+                # Keep serving the cached value; the next lookup after expiry retries synchronously
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name=f'secret-refresh-{key[0]}', daemon=True).start()
+
+
+def create_provider(backend=SECRETS_BACKEND):
+    if backend == 'aws':
+        return AwsSecretsProvider()
+    if backend == 'file':
+        return FileSecretsProvider(SECRETS_FILE)
+    if backend == 'env':
+        return EnvSecretsProvider()
+    raise ValueError(f"Unknown secrets backend '{backend}'")
+
+
+_secrets_cache = None
+_secrets_cache_lock = threading.Lock()
+
+
+def get_secrets_cache():
+    global _secrets_cache
+    if _secrets_cache is None:
+        with _secrets_cache_lock:
+            if _secrets_cache is None:
+                _secrets_cache = SecretsCache(create_provider())
+    return _secrets_cache
+
+
+def configure_secrets(provider, ttl=SECRETS_CACHE_TTL, refresh_ahead=SECRETS_REFRESH_AHEAD):
+    """Replace the process-wide secrets cache, e.g. to plug in a local provider for benchmarks."""
+    global _secrets_cache
+    with _secrets_cache_lock:
+        _secrets_cache = SecretsCache(provider, ttl=ttl, refresh_ahead=refresh_ahead)
+    return _secrets_cache
 
 
 def get_secret(secret_name, region_name='us-west-2'):
     """
-    Fetch a secret from AWS Secrets Manager and parse the JSON response.
+    Fetch a secret from the configured secrets backend and parse the JSON response.
+
+    Results are cached in memory for ``SECRETS_CACHE_TTL`` seconds and refreshed in the background.
 
     :param secret_name: Name of the secret in AWS Secrets Manager
     :param region_name: AWS region where the secret is stored
     :return: Dictionary containing the secret keys and values
     """
-    # Create a Secrets Manager client
-    client = boto3.client('secretsmanager', region_name=region_name)
-
-    try:
-        # Retrieve the secret value
-        get_secret_value_response = client.get_secret_value(SecretId=secret_name)
-    except ClientError as e:
-        # Handle the exception and raise it
-        raise e
-
-    # Decrypts secret using the associated KMS key.
-    if 'SecretString' in get_secret_value_response:
-        secret = get_secret_value_response['SecretString']
-    else:
-        secret = get_secret_value_response['SecretBinary']
-
-    # Return the secret as a dictionary
-    return json.loads(secret)
+    # Hand out a copy so callers can't mutate the cached secret
+    return dict(get_secrets_cache().get(secret_name, region_name))
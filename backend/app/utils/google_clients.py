@@ -0,0 +1,297 @@
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+
+# googleapiclient.errors is cheap to import; discovery, gspread and oauth2client pull in the HTTP and auth
+# stacks and are only imported when the first client is built
+from googleapiclient.errors import HttpError
+
+from app.core.metrics import span
+
+DRIVE_SCOPES = ("https://www.googleapis.com/auth/drive",)
+FORMS_SCOPES = ("https://www.googleapis.com/auth/forms", "https://www.googleapis.com/auth/drive")
+GSPREAD_SCOPES = ("https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive")
+
+# Sustained requests per second allowed per API, kept below the per-minute project quotas
+GOOGLE_RATE_LIMITS = {
+    'drive': float(os.getenv('GOOGLE_DRIVE_RPS', '10')),
+    'forms': float(os.getenv('GOOGLE_FORMS_RPS', '5')),
+    'sheets': float(os.getenv('GOOGLE_SHEETS_RPS', '1')),
+}
+# Requests that may go out at once after an idle period
+GOOGLE_RATE_BURST = int(os.getenv('GOOGLE_RATE_BURST', '10'))
+GOOGLE_MAX_RETRIES = int(os.getenv('GOOGLE_MAX_RETRIES', '5'))
+# Base delay in seconds of the exponential backoff, capped at GOOGLE_MAX_BACKOFF
+GOOGLE_BACKOFF = float(os.getenv('GOOGLE_BACKOFF', '0.5'))
+GOOGLE_MAX_BACKOFF = float(os.getenv('GOOGLE_MAX_BACKOFF', '32'))
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _account_key(google_creds):
+    # Service accounts are identified by their email and the id of the key in use
+    return google_creds.get('client_email'), google_creds.get('private_key_id')
+
+
+class GoogleClientRegistry:
+    """
+    Long-lived registry of Google API clients keyed by service account and scope set.
+
+    Credentials are shared by every thread so an access token is fetched once and reused until it
+    expires. Discovery-based services and gspread clients sit on top of HTTP objects that are not
+    thread-safe, so those are built once per thread and then reused.
+    """
+
+    def __init__(self):
+        self._credentials = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def get_credentials(self, google_creds, scopes):
+        key = (_account_key(google_creds), frozenset(scopes))
+        creds = self._credentials.get(key)
+        if creds is None:
+            with self._lock:
+                creds = self._credentials.get(key)
+                if creds is None:
+                    from oauth2client.service_account import ServiceAccountCredentials
+                    creds = ServiceAccountCredentials.from_json_keyfile_dict(google_creds, list(scopes))
+                    self._credentials[key] = creds
+        return creds
+
+    def _thread_clients(self):
+        clients = getattr(self._local, 'clients', None)
+        if clients is None:
+            clients = self._local.clients = {}
+        return clients
+
+    def get_service(self, api, version, google_creds, scopes):
+        clients = self._thread_clients()
+        key = (api, version, _account_key(google_creds), frozenset(scopes))
+        service = clients.get(key)
+        if service is None:
+            from googleapiclient.discovery import build
+            creds = self.get_credentials(google_creds, scopes)
+            # Use the discovery documents bundled with the client library instead of fetching them
+            with span('google.client', api):
+                service = build(api, version, credentials=creds, static_discovery=True, cache_discovery=False)
+            clients[key] = service
+        return service
+
+    def get_gspread_client(self, google_creds, scopes=GSPREAD_SCOPES):
+        clients = self._thread_clients()
+        key = ('gspread', _account_key(google_creds), frozenset(scopes))
+        client = clients.get(key)
+        if client is None:
+            import gspread
+            client = gspread.authorize(self.get_credentials(google_creds, scopes))
+            clients[key] = client
+        return client
+
+    def clear(self):
+        with self._lock:
+            self._credentials.clear()
+        self._local = threading.local()
+
+
+registry = GoogleClientRegistry()
+
+
+def get_drive_service(google_creds, scopes=DRIVE_SCOPES):
+    return registry.get_service('drive', 'v3', google_creds, scopes)
+
+
+def get_forms_service(google_creds, scopes=FORMS_SCOPES):
+    return registry.get_service('forms', 'v1', google_creds, scopes)
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` tokens per second, holding at most ``capacity``."""
+
+    def __init__(self, rate, capacity=GOOGLE_RATE_BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """
+        Block until ``tokens`` are available, returning the time spent waiting.
+
+        The bucket never holds more than ``capacity``, so a request costing more waits for a full
+        bucket and leaves it in debt; later callers wait until the debt is paid back.
+        """
+        # Never wait for more than the bucket can hold, or the call would block forever
+        needed = min(tokens, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= needed:
+                    self._tokens -= tokens
+                    return waited
+                delay = (needed - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class CallMetrics:
+    """Per-call counters for the Google API wrapper: calls, errors, retries, latency and throttle time."""
+
+    def __init__(self):
+        self._stats = defaultdict(lambda: {'calls': 0, 'errors': 0, 'retries': 0, 'seconds': 0.0,
+                                           'throttled_seconds': 0.0})
+        self._lock = threading.Lock()
+
+    def record(self, api, name, seconds, throttled=0.0, error=False, retry=False):
+        with self._lock:
+            stats = self._stats[(api, name)]
+            stats['calls'] += 1
+            stats['seconds'] += seconds
+            stats['throttled_seconds'] += throttled
+            stats['errors'] += error
+            stats['retries'] += retry
+
+    def snapshot(self):
+        with self._lock:
+            return {f"{api}.{name}": dict(stats) for (api, name), stats in self._stats.items()}
+
+
+rate_limiters = {api: TokenBucket(rate) for api, rate in GOOGLE_RATE_LIMITS.items()}
+google_api_metrics = CallMetrics()
+
+
+def error_status(error):
+    """HTTP status of a Google API error from googleapiclient or gspread, or None for other errors."""
+    if isinstance(error, HttpError):
+        return int(error.resp.status)
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None)
+
+
+def is_retryable(error):
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    return error_status(error) in RETRYABLE_STATUSES
+
+
+def backoff_delay(attempt):
+    # Exponential backoff with full jitter
+    return random.uniform(0, min(GOOGLE_MAX_BACKOFF, GOOGLE_BACKOFF * 2 ** attempt))
+
+
+def call(api, name, func, *args, cost=1, **kwargs):
+    """
+    Call ``func`` against a Google API under that API's rate limit.
+
+    429 and 5xx responses (and connection errors) are retried with exponential backoff and jitter,
+    up to GOOGLE_MAX_RETRIES times. Every attempt is recorded in ``google_api_metrics``, and the whole call,
+    throttling and backoff included, is reported as a 'google.<api>' span.
+
+    :param cost: Quota units the call uses, e.g. the number of requests in a batch
+    """
+    with span(f'google.{api}', name):
+        return _call_with_retries(api, name, func, *args, cost=cost, **kwargs)
+
+
+def _call_with_retries(api, name, func, *args, cost=1, **kwargs):
+    limiter = rate_limiters.get(api)
+    for attempt in range(GOOGLE_MAX_RETRIES + 1):
+        throttled = limiter.acquire(cost) if limiter else 0.0
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            retry = is_retryable(e) and attempt < GOOGLE_MAX_RETRIES
+            google_api_metrics.record(api, name, time.perf_counter() - start, throttled, error=True, retry=retry)
+            if not retry:
+                raise
+            time.sleep(backoff_delay(attempt))
+            continue
+        google_api_metrics.record(api, name, time.perf_counter() - start, throttled)
+        return result
+
+
+def execute(request, api, name):
+    """Execute a googleapiclient request through ``call``."""
+    return call(api, name, request.execute)
+
+
+def execute_batch(service, api, name, requests):
+    """
+    Send several requests to one API as a single batch HTTP request.
+
+    Sub-requests that fail with a retryable status are resent in a new batch with backoff; the first
+    non-retryable error is raised once every sub-request has finished.
+
+    :return: List of responses in the order of ``requests``
+    """
+    responses = [None] * len(requests)
+    pending = list(range(len(requests)))
+
+    for attempt in range(GOOGLE_MAX_RETRIES + 1):
+        errors = {}
+
+        def callback(request_id, response, exception):
+            if exception is not None:
+                errors[int(request_id)] = exception
+            else:
+                responses[int(request_id)] = response
+
+        def send():
+            # A fresh batch per attempt, so a retried batch never resends already finished requests
+            errors.clear()
+            batch = service.new_batch_http_request(callback=callback)
+            for index in pending:
+                batch.add(requests[index], request_id=str(index))
+            batch.execute()
+
+        call(api, name, send, cost=len(pending))
+
+        if not errors:
+            return responses
+        fatal = [error for error in errors.values() if not is_retryable(error)]
+        if fatal or attempt == GOOGLE_MAX_RETRIES:
+            raise (fatal or list(errors.values()))[0]
+        pending = sorted(errors)
+        time.sleep(backoff_delay(attempt))
+
+
+class RequestCoalescer:
+    """
+    Collapse identical concurrent calls into one: while a call for a key is in flight, other callers
+    with the same key wait for its result instead of issuing their own request.
+    """
+
+    def __init__(self):
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def call(self, key, func, *args, **kwargs):
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+
+coalescer = RequestCoalescer()
@@ -1,7 +1,6 @@
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-from googleapiclient.discovery import build
 from app.utils.get_secret import get_secret
+from app.utils.google_clients import registry, get_drive_service, get_forms_service, DRIVE_SCOPES, call, execute, \
+    execute_batch, coalescer, rate_limiters
 
 
 def get_google_creds(secret_name, region_name):
@@ -10,84 +9,107 @@ def get_google_creds(secret_name, region_name):
     return google_creds
 
 
-def get_gspread_client(google_creds):
-    scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-    creds = ServiceAccountCredentials.from_json_keyfile_dict(google_creds, scope)
-    client = gspread.authorize(creds)
-    return client
+def sheet_link(sheet_id):
+    return f"https://docs.google.com/spreadsheets/d/{sheet_id}/edit"
 
 
-def set_sheet_permissions(file_id, google_creds, user_email):
-    creds = ServiceAccountCredentials.from_json_keyfile_dict(google_creds, ["https://www.googleapis.com/auth/drive"])
-    drive_service = build('drive', 'v3', credentials=creds)
+def form_link(form_id):
+    return f"https://docs.google.com/forms/d/{form_id}/edit"
 
-    # Define the permission body
-    permission_body = {
-        'type': 'anyone',
-        'role': 'reader'
-    }
 
-    # Insert new permission for anyone to view
-    drive_service.permissions().create(
-        fileId=file_id,
-        body=permission_body,
-    ).execute()
+def file_id_from_link(link):
+    # Extract fileId from a sheets_link or form_link
+    return link.split('/d/')[1].split('/')[0]
 
-    # Define the permission body for the user
-    user_permission_body = {
-        'type': 'user',
-        'role': 'writer',
-        'emailAddress': user_email
-    }
 
-    # Insert new permission for the user to edit
-    drive_service.permissions().create(
-        fileId=file_id,
-        body=user_permission_body,
-    ).execute()
+def get_gspread_client(google_creds):
+    return registry.get_gspread_client(google_creds)
 
 
-def set_form_permissions(form_id, google_creds, user_email):
-    creds = ServiceAccountCredentials.from_json_keyfile_dict(google_creds, ["https://www.googleapis.com/auth/drive"])
-    drive_service = build('drive', 'v3', credentials=creds)
+# Permission bodies for Drive permissions().create
+PUBLIC_READ_PERMISSION = {
+    'type': 'anyone',
+    'role': 'reader'
+}
+
 
-    # Define the permission body for the user
-    user_permission_body = {
+def user_write_permission(user_email):
+    return {
         'type': 'user',
         'role': 'writer',
         'emailAddress': user_email
     }
 
+
+# Most sub-requests Google accepts in one batch HTTP request
+BATCH_REQUEST_LIMIT = 100
+
+
+def grant_permissions(grants, google_creds):
+    """
+    Create several Drive permissions with as few batch HTTP requests as possible.
+
+    :param grants: List of (file_id, permission_body) tuples
+    """
+    drive_service = get_drive_service(google_creds)
+    requests = [drive_service.permissions().create(fileId=file_id, body=body) for file_id, body in grants]
+    if len(requests) == 1:
+        return [execute(requests[0], 'drive', 'permissions.create')]
+
+    # A batch is charged one rate-limit token per sub-request, so it mustn't outgrow the bucket
+    chunk_size = min(BATCH_REQUEST_LIMIT, rate_limiters['drive'].capacity)
+    responses = []
+    for start in range(0, len(requests), chunk_size):
+        responses.extend(execute_batch(drive_service, 'drive', 'permissions.create',
+                                       requests[start:start + chunk_size]))
+    return responses
+
+
+def grant_public_read(file_id, google_creds):
+    # Insert new permission for anyone to view
+    grant_permissions([(file_id, PUBLIC_READ_PERMISSION)], google_creds)
+
+
+def grant_user_write(file_id, google_creds, user_email):
     # Insert new permission for the user to edit
-    drive_service.permissions().create(
-        fileId=form_id,
-        body=user_permission_body,
-    ).execute()
+    grant_permissions([(file_id, user_write_permission(user_email))], google_creds)
 
 
-def create_google_sheet(title, google_creds, user_email):
+def set_sheet_permissions(file_id, google_creds, user_email):
+    grant_permissions([
+        (file_id, PUBLIC_READ_PERMISSION),
+        (file_id, user_write_permission(user_email)),
+    ], google_creds)
+
+
+def set_form_permissions(form_id, google_creds, user_email):
+    grant_user_write(form_id, google_creds, user_email)
+
+
+def create_sheet_file(title, google_creds):
     client = get_gspread_client(google_creds)
-    sheet = client.create(title)
-    set_sheet_permissions(sheet.id, google_creds, user_email)
+    # gspread creates spreadsheets through the Drive API
+    sheet = call('drive', 'files.create', client.create, title)
     return sheet.id
 
 
-def create_google_form(title, google_creds, user_email):
-    creds = ServiceAccountCredentials.from_json_keyfile_dict(google_creds, ["https://www.googleapis.com/auth/forms",
-                                                                            "https://www.googleapis.com/auth/drive"])
-    service = build('forms', 'v1', credentials=creds)
+def create_form_file(title, google_creds):
+    service = get_forms_service(google_creds)
 
-    # Step 1: Create the form with only the title
+    # Create the form with only the title, questions are added with batchUpdate
     form = {
         "info": {
             "title": title,
             "documentTitle": title
         }
     }
-    created_form = service.forms().create(body=form).execute()
-    set_form_permissions(created_form['formId'], google_creds, user_email)
+    created_form = execute(service.forms().create(body=form), 'forms', 'forms.create')
+    return created_form['formId']
+
+
+def add_form_questions(form_id, google_creds):
+    service = get_forms_service(google_creds)
 
-    # Step 2: Use batchUpdate to add questions
     requests = [
         {
             "createItem": {
@@ -130,76 +152,171 @@ def create_google_form(title, google_creds, user_email):
     batch_update_request = {
         "requests": requests
     }
-    service.forms().batchUpdate(formId=created_form['formId'], body=batch_update_request).execute()
+    execute(service.forms().batchUpdate(formId=form_id, body=batch_update_request), 'forms', 'forms.batchUpdate')
 
-    return created_form['formId']
+
+def create_google_sheet(title, google_creds, user_email):
+    sheet_id = create_sheet_file(title, google_creds)
+    set_sheet_permissions(sheet_id, google_creds, user_email)
+    return sheet_id
+
+
+def create_google_form(title, google_creds, user_email):
+    form_id = create_form_file(title, google_creds)
+    set_form_permissions(form_id, google_creds, user_email)
+    add_form_questions(form_id, google_creds)
+    return form_id
+
+
+def close_google_form(form_id, google_creds):
+    # Stop the form from accepting responses; it stays readable for the final sync
+    service = get_forms_service(google_creds)
+    body = {
+        "publishSettings": {
+            "publishState": {
+                "isAcceptingResponses": False
+            }
+        },
+        "updateMask": "publishState.isAcceptingResponses"
+    }
+    execute(service.forms().setPublishSettings(formId=form_id, body=body), 'forms', 'forms.setPublishSettings')
 
 
 def delete_google_sheet(sheet_id, google_creds):
-    creds = ServiceAccountCredentials.from_json_keyfile_dict(google_creds, ["https://www.googleapis.com/auth/drive"])
-    drive_service = build('drive', 'v3', credentials=creds)
-    drive_service.files().delete(fileId=sheet_id).execute()
+    drive_service = get_drive_service(google_creds)
+    execute(drive_service.files().delete(fileId=sheet_id), 'drive', 'files.delete')
 
 
 def delete_google_form(form_id, google_creds):
-    creds = ServiceAccountCredentials.from_json_keyfile_dict(google_creds, ["https://www.googleapis.com/auth/drive"])
-    drive_service = build('drive', 'v3', credentials=creds)
-    drive_service.files().delete(fileId=form_id).execute()
+    drive_service = get_drive_service(google_creds)
+    execute(drive_service.files().delete(fileId=form_id), 'drive', 'files.delete')
+
+
+# Largest page the Forms API returns from responses.list
+FORM_RESPONSES_PAGE_SIZE = 5000
+
 
+def iter_form_responses(form_id, google_creds, since=None, inclusive=False, page_size=FORM_RESPONSES_PAGE_SIZE):
+    """
+    Yield form responses page by page, following nextPageToken until every page has been read.
 
-def get_form_responses(form_id, google_creds):
-    creds = ServiceAccountCredentials.from_json_keyfile_dict(google_creds, ["https://www.googleapis.com/auth/drive"])
-    service = build('forms', 'v1', credentials=creds)
+    :param since: Optional RFC3339 timestamp, only responses submitted after it are returned
+    :param inclusive: Also return responses submitted exactly at ``since``
+    """
+    service = get_forms_service(google_creds, DRIVE_SCOPES)
 
-    # Fetch the form responses
-    responses = service.forms().responses().list(formId=form_id).execute()
+    kwargs = {'formId': form_id, 'pageSize': page_size}
+    if since:
+        kwargs['filter'] = f"timestamp {'>=' if inclusive else '>'} {since}"
 
-    return responses.get('responses', [])
+    page_token = None
+    while True:
+        if page_token:
+            kwargs['pageToken'] = page_token
+        page = execute(service.forms().responses().list(**kwargs), 'forms', 'responses.list')
+        yield from page.get('responses', [])
+
+        page_token = page.get('nextPageToken')
+        if not page_token:
+            break
+
+
+def get_form_responses(form_id, google_creds, since=None):
+    # Fetch every form response submitted at or after ``since``
+    return list(iter_form_responses(form_id, google_creds, since=since, inclusive=True))
 
 
 def get_form_details(form_id, google_creds):
-    creds = ServiceAccountCredentials.from_json_keyfile_dict(google_creds, ["https://www.googleapis.com/auth/drive"])
-    service = build('forms', 'v1', credentials=creds)
+    service = get_forms_service(google_creds, DRIVE_SCOPES)
 
-    # Fetch the form details
-    form_details = service.forms().get(formId=form_id).execute()
+    # Fetch the form details; concurrent lookups of the same form share one request
+    form_details = coalescer.call(('forms.get', form_id), execute, service.forms().get(formId=form_id),
+                                  'forms', 'forms.get')
 
     return form_details
 
 
-def get_existing_data(sheet_id, google_creds):
+def get_question_map(form_details):
+    # Map question ids to question titles, e.g. {'1a2b3c4d': 'Game Name'}
+    question_map = {}
+    for item in form_details.get('items', []):
+        question = item.get('questionItem', {}).get('question')
+        if question:
+            question_map[question['questionId']] = item.get('title')
+    return question_map
+
+
+def parse_signup(response, question_map):
+    game_name = ""
+    tag_line = ""
+    for question_id, answer in response.get('answers', {}).items():
+        question_text = question_map.get(question_id, "Unknown Question")
+        if question_text == "Game Name":
+            game_name = answer['textAnswers']['answers'][0]['value']
+        elif question_text == "Tag Line":
+            tag_line = answer['textAnswers']['answers'][0]['value']
+    return game_name, tag_line
+
+
+def iter_signups(form_id, google_creds, since=None, inclusive=False, question_map=None):
+    """
+    Stream parsed signups for a form, reading the responses one page at a time.
+
+    :return: Generator of dictionaries with response_id, game_name, tag_line and submitted_at
+    """
+    if question_map is None:
+        question_map = get_question_map(get_form_details(form_id, google_creds))
+
+    for response in iter_form_responses(form_id, google_creds, since=since, inclusive=inclusive):
+        game_name, tag_line = parse_signup(response, question_map)
+        yield {
+            'response_id': response.get('responseId'),
+            'game_name': game_name,
+            'tag_line': tag_line,
+            'submitted_at': response.get('lastSubmittedTime'),
+        }
+
+
+SIGNUP_HEADERS = ['Game Name', 'Tag Line']
+
+
+def open_signup_sheet(sheet_id, google_creds):
     client = get_gspread_client(google_creds)
-    sheet = client.open_by_key(sheet_id).worksheet('Sheet1')
-    existing_data = sheet.get_all_records()
+    return call('sheets', 'open', lambda: client.open_by_key(sheet_id).worksheet('Sheet1'))
+
+
+def get_existing_data(sheet_id, google_creds, sheet=None):
+    if sheet is None:
+        sheet = open_signup_sheet(sheet_id, google_creds)
+    existing_data = call('sheets', 'values.get', sheet.get_all_records)
     return existing_data
 
 
+def append_signup_rows(sheet, rows, include_headers=False):
+    # Write every new row with a single Sheets API call
+    if include_headers:
+        rows = [SIGNUP_HEADERS] + list(rows)
+    if rows:
+        call('sheets', 'values.append', sheet.append_rows, rows, value_input_option='RAW', table_range='A1:B1')
+
+
 def write_responses_to_sheet(sheet_id, responses, google_creds, question_map):
-    client = get_gspread_client(google_creds)
-    sheet = client.open_by_key(sheet_id).worksheet('Sheet1')
+    sheet = open_signup_sheet(sheet_id, google_creds)
 
     # Fetch existing data
-    existing_data = get_existing_data(sheet_id, google_creds)
+    existing_data = get_existing_data(sheet_id, google_creds, sheet=sheet)
 
     # Extract existing Game Name and Tag Line pairs
     existing_pairs = set((row['Game Name'], row['Tag Line']) for row in existing_data)
 
-    # Assuming the first row contains headers and data starts from the second row
-    start_row = len(existing_data) + 2
-
+    new_rows = []
     for response in responses:
-        game_name = ""
-        tag_line = ""
-        for question_id, answer in response['answers'].items():
-            question_text = question_map.get(question_id, "Unknown Question")
-            if question_text == "Game Name":
-                game_name = answer['textAnswers']['answers'][0]['value']
-            elif question_text == "Tag Line":
-                tag_line = answer['textAnswers']['answers'][0]['value']
+        pair = parse_signup(response, question_map)
 
         # Check if the pair already exists
-        if (game_name, tag_line) not in existing_pairs:
-            # Append the new data to the sheet
-            sheet.append_row([game_name, tag_line], table_range=f'A{start_row}:B{start_row}')
-            start_row += 1
+        if pair not in existing_pairs:
+            existing_pairs.add(pair)
+            new_rows.append(list(pair))
 
+    append_signup_rows(sheet, new_rows)
+    return len(new_rows)
@@ -0,0 +1,238 @@
+import asyncio
+import logging
+import os
+import random
+import socket
+from datetime import timedelta
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import selectinload
+
+from app.db.database import get_async_database_session
+from app.models.db_models import Tournament as db_tournament
+from app.utils.cache import response_cache, tournament_cache_key, user_profile_cache_keys
+from app.utils.google_services import get_google_creds, sheet_link, form_link, file_id_from_link
+from app.utils.provisioning import provision_google_files, cleanup_google_files
+from app.utils.scheduler import deadline_scheduler, utcnow
+
+PROVISIONING_WORKERS = int(os.getenv('PROVISIONING_WORKERS', '4'))
+PROVISIONING_QUEUE_SIZE = int(os.getenv('PROVISIONING_QUEUE_SIZE', '100'))
+PROVISIONING_MAX_ATTEMPTS = int(os.getenv('PROVISIONING_MAX_ATTEMPTS', '5'))
+# Base delay in seconds for the exponential backoff between attempts
+PROVISIONING_BACKOFF = float(os.getenv('PROVISIONING_BACKOFF', '2'))
+# How long a claimed job is reserved for its worker, renewed on every attempt; after that another worker may take it
+PROVISIONING_LEASE_SECONDS = float(os.getenv('PROVISIONING_LEASE_SECONDS', '600'))
+
+logger = logging.getLogger(__name__)
+
+
+async def _load_job(tournament_id):
+    async with get_async_database_session() as db:
+        tournament = (await db.execute(
+            select(db_tournament).options(selectinload(db_tournament.organizers))
+            .where(db_tournament.id == tournament_id)
+        )).scalars().first()
+        if not tournament:
+            return None
+        return {
+            'name': tournament.name,
+            'status': tournament.status,
+            'sign_up_deadline': tournament.sign_up_deadline,
+            'sheets_link': tournament.sheets_link,
+            'form_link': tournament.form_link,
+            'organizer_email': tournament.organizers[0].email if tournament.organizers else None,
+            'organizer_usernames': [organizer.username for organizer in tournament.organizers],
+        }
+
+
+async def _update_tournament(tournament_id, **values):
+    async with get_async_database_session() as db:
+        await db.execute(update(db_tournament).where(db_tournament.id == tournament_id).values(**values))
+        await db.commit()
+
+
+def _lease_available(now):
+    return or_(db_tournament.provisioning_lease_expires_at.is_(None),
+               db_tournament.provisioning_lease_expires_at < now)
+
+
+async def _pending_tournament_ids():
+    # Jobs no worker holds: never claimed, or claimed by a worker that stopped renewing its lease
+    async with get_async_database_session() as db:
+        rows = await db.execute(select(db_tournament.id).where(db_tournament.status == 'provisioning',
+                                                               _lease_available(utcnow())))
+        return [row.id for row in rows]
+
+
+async def _claim_job(tournament_id, owner, renew=False):
+    """
+    Atomically take (or with ``renew``, extend) the lease on a tournament that still has to be
+    provisioned. False when it's finished, deleted or held by another worker.
+    """
+    now = utcnow()
+    held = db_tournament.provisioning_lease_owner == owner if renew else _lease_available(now)
+    async with get_async_database_session() as db:
+        result = await db.execute(
+            update(db_tournament)
+            .where(db_tournament.id == tournament_id, db_tournament.status == 'provisioning', held)
+            .values(provisioning_lease_owner=owner,
+                    provisioning_lease_expires_at=now + timedelta(seconds=PROVISIONING_LEASE_SECONDS))
+        )
+        await db.commit()
+        return result.rowcount == 1
+
+
+async def _release_job(tournament_id, owner):
+    async with get_async_database_session() as db:
+        await db.execute(update(db_tournament).where(db_tournament.id == tournament_id,
+                                                     db_tournament.provisioning_lease_owner == owner)
+                         .values(provisioning_lease_owner=None, provisioning_lease_expires_at=None))
+        await db.commit()
+
+
+async def _invalidate_cached_pages(tournament_id, job):
+    await response_cache.invalidate(tournament_cache_key(tournament_id, job['name']),
+                                    *user_profile_cache_keys(*job['organizer_usernames']))
+
+
+async def _cleanup_recorded_files(job, google_creds):
+    # Files recorded by an earlier attempt (or a crashed worker) are deleted before trying again
+    sheet_id = file_id_from_link(job['sheets_link']) if job['sheets_link'] else None
+    form_id = file_id_from_link(job['form_link']) if job['form_link'] else None
+    await cleanup_google_files(google_creds, sheet_id, form_id)
+
+
+class ProvisioningQueue:
+    """
+    Bounded queue of tournaments whose Google sheet and form still have to be created.
+
+    The tournament rows themselves are the persistent record of the queue: rows in the 'provisioning'
+    state that no worker holds are re-enqueued on startup and then every lease period, and the files
+    of an interrupted attempt are recorded on the row so they can be deleted before the job is retried.
+    A worker only runs a job after claiming its lease, so a tournament is never provisioned twice at once.
+    """
+
+    def __init__(self, workers=PROVISIONING_WORKERS, maxsize=PROVISIONING_QUEUE_SIZE,
+                 max_attempts=PROVISIONING_MAX_ATTEMPTS, backoff=PROVISIONING_BACKOFF):
+        self.workers = workers
+        self.maxsize = maxsize
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._queue = None
+        self._tasks = []
+        self._queued = set()
+
+    async def start(self, recover=True):
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        if recover:
+            self._tasks.append(asyncio.create_task(self._recover()))
+
+    async def _recover(self):
+        # Picks up jobs left by crashed or stopped workers once their leases expire
+        while True:
+            try:
+                for tournament_id in await _pending_tournament_ids():
+                    if not self.enqueue(tournament_id):
+                        break
+            except Exception:
+                logger.warning("Recovering provisioning jobs failed", exc_info=True)
+            await asyncio.sleep(PROVISIONING_LEASE_SECONDS)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def full(self):
+        return self._queue is None or self._queue.full()
+
+    def enqueue(self, tournament_id):
+        """Queue a tournament for provisioning. Returns False when the queue is full or not running."""
+        if self._queue is None:
+            return False
+        if tournament_id in self._queued:
+            return True
+        try:
+            self._queue.put_nowait(tournament_id)
+        except asyncio.QueueFull:
+            return False
+        self._queued.add(tournament_id)
+        return True
+
+    async def _worker(self):
+        while True:
+            tournament_id = await self._queue.get()
+            try:
+                await self._run(tournament_id)
+            except Exception:
+                logger.exception("Provisioning job for tournament %s crashed", tournament_id)
+            finally:
+                self._queued.discard(tournament_id)
+                self._queue.task_done()
+
+    async def _run(self, tournament_id):
+        if not await _claim_job(tournament_id, self.owner):
+            # Finished, deleted, or being provisioned by another worker
+            return
+        try:
+            await self._attempt_all(tournament_id)
+        finally:
+            await _release_job(tournament_id, self.owner)
+
+    async def _attempt_all(self, tournament_id):
+        for attempt in range(1, self.max_attempts + 1):
+            if attempt > 1 and not await _claim_job(tournament_id, self.owner, renew=True):
+                logger.warning("Lost the provisioning lease on tournament %s", tournament_id)
+                return
+            try:
+                await self._provision(tournament_id, attempt)
+                return
+            except Exception as e:
+                logger.warning("Provisioning attempt %s for tournament %s failed: %s", attempt, tournament_id, e)
+                if attempt == self.max_attempts:
+                    await self._fail(tournament_id, str(e))
+                    return
+                await _update_tournament(tournament_id, provisioning_error=str(e), provisioning_step='retrying')
+                # Exponential backoff with full jitter
+                await asyncio.sleep(random.uniform(0, self.backoff * 2 ** (attempt - 1)))
+
+    async def _provision(self, tournament_id, attempt):
+        job = await _load_job(tournament_id)
+        # Already finished, failed or deleted: running the job again must be a no-op
+        if job is None or job['status'] != 'provisioning':
+            return
+
+        google_creds = await asyncio.to_thread(get_google_creds, 'google-sheets-key', 'us-west-2')
+        await _update_tournament(tournament_id, provisioning_attempts=attempt, provisioning_step='creating_files')
+        if job['sheets_link'] or job['form_link']:
+            await _cleanup_recorded_files(job, google_creds)
+            await _update_tournament(tournament_id, sheets_link=None, form_link=None)
+
+        async def record_files(sheet_id, form_id):
+            await _update_tournament(tournament_id, sheets_link=sheet_link(sheet_id), form_link=form_link(form_id),
+                                     provisioning_step='configuring_files')
+
+        await provision_google_files(job['name'], google_creds, job['organizer_email'],
+                                     on_files_created=record_files)
+        await _update_tournament(tournament_id, status='ready', provisioning_step=None, provisioning_error=None)
+        await _invalidate_cached_pages(tournament_id, job)
+        deadline_scheduler.schedule(tournament_id, job['sign_up_deadline'])
+
+    async def _fail(self, tournament_id, error):
+        job = await _load_job(tournament_id)
+        if job and (job['sheets_link'] or job['form_link']):
+            try:
+                google_creds = await asyncio.to_thread(get_google_creds, 'google-sheets-key', 'us-west-2')
+                await _cleanup_recorded_files(job, google_creds)
+            except Exception:
+                logger.exception("Cleanup for tournament %s failed", tournament_id)
+        await _update_tournament(tournament_id, status='failed', provisioning_step=None,
+                                 provisioning_error=error, sheets_link=None, form_link=None)
+        if job:
+            await _invalidate_cached_pages(tournament_id, job)
+
+
+provisioning_queue = ProvisioningQueue()
@@ -0,0 +1,61 @@
+import base64
+import json
+from datetime import date
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models.db_models import Tournament as db_tournament
+from app.models.models import Tournament, TournamentPage, CompactTournamentList
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(tournament):
+    # Opaque to clients: the (start_date, id) sort key of the last tournament on the page
+    raw = json.dumps([tournament.start_date.isoformat(), tournament.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        start_date, tournament_id = json.loads(base64.urlsafe_b64decode(padded))
+        return date.fromisoformat(start_date), int(tournament_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+async def paginate_tournaments(db: AsyncSession, query, cursor: Optional[str], limit: int, compact: bool = False):
+    """
+    Fetch one page of tournaments with keyset pagination, newest start date first.
+
+    Instead of an OFFSET, the page starts right after the (start_date, id) of the cursor, so every page
+    costs the same index range scan no matter how deep the client has paged.
+
+    :param compact: Return a CompactTournamentList instead of a TournamentPage
+    """
+    query = query.order_by(db_tournament.start_date.desc(), db_tournament.id.desc())
+    if cursor:
+        start_date, tournament_id = decode_cursor(cursor)
+        query = query.where(or_(
+            db_tournament.start_date < start_date,
+            and_(db_tournament.start_date == start_date, db_tournament.id < tournament_id),
+        ))
+
+    # One extra row tells whether another page exists
+    rows = (await db.execute(
+        query.options(selectinload(db_tournament.organizers)).limit(limit + 1)
+    )).scalars().all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    items = [Tournament.from_db(tournament) for tournament in rows]
+    next_cursor = encode_cursor(rows[-1]) if has_more else None
+    if compact:
+        return CompactTournamentList.from_tournaments(items, next_cursor)
+    return TournamentPage.construct_trusted(items=items, next_cursor=next_cursor)
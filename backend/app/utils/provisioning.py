@@ -0,0 +1,67 @@
+import asyncio
+
+from app.utils.google_services import create_sheet_file, create_form_file, add_form_questions, grant_permissions, \
+    delete_google_sheet, delete_google_form, PUBLIC_READ_PERMISSION, user_write_permission
+
+
+async def _gather(*calls):
+    """Run blocking (func, *args) calls concurrently in worker threads, returning results or exceptions."""
+    return await asyncio.gather(*(asyncio.to_thread(*call) for call in calls), return_exceptions=True)
+
+
+def _first_error(results):
+    return next((result for result in results if isinstance(result, BaseException)), None)
+
+
+async def cleanup_google_files(google_creds, sheet_id=None, form_id=None):
+    """Delete the given sheet and form concurrently; failures are ignored so cleanup never masks the original error."""
+    calls = []
+    if sheet_id:
+        calls.append((delete_google_sheet, sheet_id, google_creds))
+    if form_id:
+        calls.append((delete_google_form, form_id, google_creds))
+    if calls:
+        await _gather(*calls)
+
+
+async def provision_google_files(name, google_creds, user_email, on_files_created=None):
+    """
+    Create the sign-up sheet and form for a tournament.
+
+    The sheet and form are created concurrently, then the batched permission grants and the form
+    questions, which only depend on the file ids, are issued in parallel. On failure every file that was created
+    is deleted before the error is re-raised.
+
+    :param on_files_created: Optional coroutine function called with (sheet_id, form_id) as soon as
+        both files exist, so callers can record them before the remaining steps run
+    :return: Tuple of (sheet_id, form_id)
+    """
+    sheet_result, form_result = await _gather(
+        (create_sheet_file, f"Tournament: {name}", google_creds),
+        (create_form_file, f"Tournament Sign-Up: {name}", google_creds),
+    )
+    sheet_id = None if isinstance(sheet_result, BaseException) else sheet_result
+    form_id = None if isinstance(form_result, BaseException) else form_result
+
+    error = _first_error([sheet_result, form_result])
+    if error is None and on_files_created is not None:
+        try:
+            await on_files_created(sheet_id, form_id)
+        except Exception as e:
+            error = e
+    if error is None:
+        # The three permission grants share one Drive batch request
+        error = _first_error(await _gather(
+            (grant_permissions, [
+                (sheet_id, PUBLIC_READ_PERMISSION),
+                (sheet_id, user_write_permission(user_email)),
+                (form_id, user_write_permission(user_email)),
+            ], google_creds),
+            (add_form_questions, form_id, google_creds),
+        ))
+
+    if error is not None:
+        await cleanup_google_files(google_creds, sheet_id, form_id)
+        raise error
+
+    return sheet_id, form_id
@@ -0,0 +1,221 @@
+import threading
+import weakref
+from datetime import datetime, timezone
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.db.database import get_database_session
+from app.models.db_models import Tournament as db_tournament, Signup as db_signup
+from app.utils.cache import TTLCache
+from app.utils.google_clients import call
+from app.utils.google_services import get_google_creds, get_form_details, get_question_map, iter_signups, \
+    open_signup_sheet, append_signup_rows, file_id_from_link
+
+# Maximum number of rows inserted per statement and written to the sheet per append call
+SYNC_BATCH_SIZE = 1000
+
+# Question maps by form id; questions are fixed once a form exists, so entries only leave to bound memory
+_question_maps = TTLCache(maxsize=1024, ttl=24 * 3600)
+# Held only while some thread syncs the tournament, so finished tournaments don't keep a lock forever
+_sync_locks = weakref.WeakValueDictionary()
+_sync_locks_lock = threading.Lock()
+
+
+def _sync_lock(tournament_id):
+    with _sync_locks_lock:
+        lock = _sync_locks.get(tournament_id)
+        if lock is None:
+            lock = _sync_locks[tournament_id] = threading.Lock()
+        return lock
+
+
+def _question_map(form_id, google_creds):
+    # Questions are fixed when the form is created, so the map only has to be fetched once per form
+    question_map = _question_maps.get(form_id)
+    if question_map is None:
+        question_map = get_question_map(get_form_details(form_id, google_creds))
+        _question_maps.set(form_id, question_map)
+    return question_map
+
+
+def parse_timestamp(value):
+    # Forms timestamps are RFC3339 in UTC, e.g. 2024-05-01T12:34:56.789Z; stored as naive UTC
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _insert_ignoring_duplicates(db):
+    dialect = db.get_bind().dialect.name
+    if dialect == 'postgresql':
+        return postgresql.insert(db_signup).on_conflict_do_nothing()
+    if dialect == 'sqlite':
+        return sqlite.insert(db_signup).on_conflict_do_nothing()
+    return None
+
+
+def _new_rows_only(db, tournament_id, rows):
+    # Portable fallback for databases without ON CONFLICT DO NOTHING; concurrent syncs of a tournament
+    # are serialized by its sync lock, so no other writer can add the same player in between
+    existing = set(db.execute(
+        select(db_signup.game_name, db_signup.tag_line).where(
+            db_signup.tournament_id == tournament_id,
+            # Row-value IN isn't portable either; filtering on the name narrows it down enough
+            db_signup.game_name.in_({row['game_name'] for row in rows}),
+        )
+    ).all())
+    new_rows = {}
+    for row in rows:
+        key = (row['game_name'], row['tag_line'])
+        if key not in existing:
+            new_rows.setdefault(key, row)
+    return list(new_rows.values())
+
+
+def bulk_insert_signups(db, tournament_id, signups):
+    """Insert signups in one statement, skipping players already signed up for the tournament."""
+    if not signups:
+        return
+    rows = [
+        {
+            'tournament_id': tournament_id,
+            'game_name': signup['game_name'],
+            'tag_line': signup['tag_line'],
+            'submitted_at': parse_timestamp(signup['submitted_at']),
+            'response_id': signup['response_id'],
+        }
+        for signup in signups
+    ]
+    statement = _insert_ignoring_duplicates(db)
+    if statement is None:
+        statement, rows = insert(db_signup), _new_rows_only(db, tournament_id, rows)
+        if not rows:
+            return
+    db.execute(statement, rows)
+
+
+def import_signups(tournament_id, form_id, google_creds, synced_at):
+    """
+    Stream form responses submitted since ``synced_at`` into the signups table.
+
+    :return: The new high-water mark (lastSubmittedTime of the newest response seen)
+    """
+    question_map = _question_map(form_id, google_creds)
+    latest = synced_at
+    batch = []
+
+    with get_database_session() as db:
+        # Responses at the high-water mark are fetched again; the unique constraint drops the duplicates
+        for signup in iter_signups(form_id, google_creds, since=synced_at, inclusive=True,
+                                   question_map=question_map):
+            batch.append(signup)
+            submitted = signup['submitted_at']
+            # RFC3339 timestamps in UTC compare correctly as strings
+            if submitted and (latest is None or submitted > latest):
+                latest = submitted
+            if len(batch) >= SYNC_BATCH_SIZE:
+                bulk_insert_signups(db, tournament_id, batch)
+                batch = []
+        bulk_insert_signups(db, tournament_id, batch)
+
+        if latest != synced_at:
+            db.execute(update(db_tournament).where(db_tournament.id == tournament_id)
+                       .values(responses_synced_at=latest))
+        db.commit()
+    return latest
+
+
+def _mark_mirrored(db, signup_ids):
+    db.execute(update(db_signup).where(db_signup.id.in_(signup_ids)).values(mirrored=True))
+    db.commit()
+
+
+def mirror_signups_to_sheet(tournament_id, sheet_id, google_creds):
+    """
+    Append signups that aren't in the tournament's sheet yet, in batches of ``SYNC_BATCH_SIZE`` rows.
+
+    The sheet is only read the first time a tournament is mirrored, to adopt rows written before the
+    signups table existed; after that the mirrored flag is the only bookkeeping needed.
+    """
+    sheet = open_signup_sheet(sheet_id, google_creds)
+    mirrored = 0
+
+    with get_database_session() as db:
+        already_mirrored = db.execute(
+            select(db_signup.id).where(db_signup.tournament_id == tournament_id, db_signup.mirrored.is_(True)).limit(1)
+        ).first()
+
+        include_headers = False
+        sheet_keys = set()
+        if already_mirrored is None:
+            values = call('sheets', 'values.get', sheet.get_all_values)
+            include_headers = not values
+            # The first row holds the headers once anything has been written
+            sheet_keys = set((row[0], row[1]) for row in values[1:] if len(row) >= 2)
+
+        last_id = 0
+        while True:
+            rows = db.execute(
+                select(db_signup.id, db_signup.game_name, db_signup.tag_line)
+                .where(db_signup.tournament_id == tournament_id, db_signup.mirrored.is_(False), db_signup.id > last_id)
+                .order_by(db_signup.id).limit(SYNC_BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            new_rows = [[row.game_name, row.tag_line] for row in rows if (row.game_name, row.tag_line) not in sheet_keys]
+            append_signup_rows(sheet, new_rows, include_headers=include_headers)
+            include_headers = False
+            _mark_mirrored(db, [row.id for row in rows])
+            mirrored += len(new_rows)
+
+    return mirrored
+
+
+def _load_sync_state(tournament_id):
+    with get_database_session() as db:
+        tournament = db.query(db_tournament).filter(db_tournament.id == tournament_id).first()
+        if not tournament or tournament.status != 'ready':
+            return None
+        return file_id_from_link(tournament.sheets_link), file_id_from_link(tournament.form_link), \
+            tournament.responses_synced_at
+
+
+def import_tournament_responses(tournament_id):
+    """
+    Import new form responses into the signups table without touching the sheet.
+
+    :return: The new high-water mark, or None if the tournament doesn't exist or isn't provisioned yet
+    """
+    with _sync_lock(tournament_id):
+        state = _load_sync_state(tournament_id)
+        if state is None:
+            return None
+        _, form_id, synced_at = state
+        google_creds = get_google_creds('google-sheets-key', 'us-west-2')
+        return import_signups(tournament_id, form_id, google_creds, synced_at)
+
+
+def sync_tournament_responses(tournament_id):
+    """
+    Import new form responses into the signups table, then mirror them to the tournament's sheet.
+
+    Only responses at or after the stored high-water mark are streamed from the form and duplicates
+    are dropped by the table's unique constraint, so neither step has to read the sheet back.
+
+    :return: Dictionary with the number of signups written to the sheet and the new high-water mark,
+        or None if the tournament doesn't exist or isn't provisioned yet
+    """
+    with _sync_lock(tournament_id):
+        state = _load_sync_state(tournament_id)
+        if state is None:
+            return None
+        sheet_id, form_id, synced_at = state
+
+        google_creds = get_google_creds('google-sheets-key', 'us-west-2')
+        latest = import_signups(tournament_id, form_id, google_creds, synced_at)
+        new_signups = mirror_signups_to_sheet(tournament_id, sheet_id, google_creds)
+
+        return {'new_signups': new_signups, 'synced_until': latest}
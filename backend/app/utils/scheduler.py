@@ -0,0 +1,183 @@
+import asyncio
+import heapq
+import logging
+import os
+import socket
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import or_, select, update
+
+from app.db.database import get_async_database_session
+from app.models.db_models import Tournament as db_tournament
+from app.utils.google_services import get_google_creds, close_google_form, file_id_from_link
+from app.utils.response_sync import sync_tournament_responses
+
+# Deadlines further away than this are not held in memory; they are picked up by a later reload
+SCHEDULER_HORIZON = float(os.getenv('SCHEDULER_HORIZON', str(24 * 3600)))
+# Seconds between reloads of upcoming deadlines, which also catches tournaments created by other workers
+SCHEDULER_RELOAD_INTERVAL = float(os.getenv('SCHEDULER_RELOAD_INTERVAL', '300'))
+# How long a worker may take to close a tournament's sign-ups before another worker may take over
+SCHEDULER_LEASE_SECONDS = float(os.getenv('SCHEDULER_LEASE_SECONDS', '600'))
+# Tournaments whose sign-ups are being closed at the same time
+SCHEDULER_CONCURRENCY = int(os.getenv('SCHEDULER_CONCURRENCY', '4'))
+# Delay before a failed close is attempted again
+SCHEDULER_RETRY_DELAY = float(os.getenv('SCHEDULER_RETRY_DELAY', '60'))
+
+logger = logging.getLogger(__name__)
+
+
+def utcnow():
+    # Deadlines are stored as naive UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def to_naive_utc(value):
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+async def _acquire_close_lease(tournament_id, owner):
+    """Atomically claim a tournament whose sign-ups still have to be closed; False if closed or claimed."""
+    now = utcnow()
+    async with get_async_database_session() as db:
+        result = await db.execute(
+            update(db_tournament)
+            .where(db_tournament.id == tournament_id, db_tournament.status == 'ready',
+                   db_tournament.signups_closed_at.is_(None),
+                   or_(db_tournament.close_lease_expires_at.is_(None), db_tournament.close_lease_expires_at < now))
+            .values(close_lease_owner=owner, close_lease_expires_at=now + timedelta(seconds=SCHEDULER_LEASE_SECONDS))
+        )
+        await db.commit()
+        return result.rowcount == 1
+
+
+async def _release_close_lease(tournament_id, owner, closed):
+    values = {'close_lease_owner': None, 'close_lease_expires_at': None}
+    if closed:
+        values['signups_closed_at'] = utcnow()
+    async with get_async_database_session() as db:
+        await db.execute(update(db_tournament).where(db_tournament.id == tournament_id,
+                                                     db_tournament.close_lease_owner == owner).values(**values))
+        await db.commit()
+
+
+def close_signups(tournament_id, form_link):
+    """Stop the tournament's form from accepting responses, then sync every response it received."""
+    google_creds = get_google_creds('google-sheets-key', 'us-west-2')
+    close_google_form(file_id_from_link(form_link), google_creds)
+    return sync_tournament_responses(tournament_id)
+
+
+class DeadlineScheduler:
+    """
+    Closes sign-ups of every tournament at its ``sign_up_deadline``.
+
+    Upcoming deadlines sit in a min-heap, so scheduling is O(log n) and a single task sleeps until the
+    earliest one; nothing polls individual tournaments. Rescheduling a tournament leaves its old heap
+    entry behind, which is skipped when it comes up. Every worker runs a scheduler, and a lease on
+    the tournament row makes sure only one of them closes each tournament.
+    """
+
+    def __init__(self, horizon=SCHEDULER_HORIZON, reload_interval=SCHEDULER_RELOAD_INTERVAL,
+                 concurrency=SCHEDULER_CONCURRENCY):
+        self.horizon = horizon
+        self.reload_interval = reload_interval
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._heap = []
+        self._deadlines = {}
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._wakeup = None
+        self._task = None
+        # Close jobs in flight, by tournament id
+        self._closing = {}
+
+    async def start(self):
+        # Deadlines are loaded by the task, so startup doesn't need the database
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        tasks = ([self._task] if self._task else []) + list(self._closing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+
+    def schedule(self, tournament_id, deadline):
+        """Close the tournament's sign-ups at ``deadline``, replacing any earlier schedule for it."""
+        deadline = to_naive_utc(deadline)
+        if deadline > utcnow() + timedelta(seconds=self.horizon):
+            # Loaded by the reload that brings it within the horizon
+            return
+        self._deadlines[tournament_id] = deadline
+        heapq.heappush(self._heap, (deadline, tournament_id))
+        if self._wakeup is not None and self._heap[0] == (deadline, tournament_id):
+            self._wakeup.set()
+
+    async def reload(self):
+        # Range scan on ix_tournaments_sign_up_deadline; overdue tournaments are included so missed deadlines still close
+        async with get_async_database_session() as db:
+            rows = (await db.execute(
+                select(db_tournament.id, db_tournament.sign_up_deadline)
+                .where(db_tournament.sign_up_deadline <= utcnow() + timedelta(seconds=self.horizon),
+                       db_tournament.signups_closed_at.is_(None), db_tournament.status == 'ready')
+            )).all()
+        for row in rows:
+            if row.id not in self._deadlines and row.id not in self._closing:
+                self.schedule(row.id, row.sign_up_deadline)
+
+    async def _run(self):
+        next_reload = utcnow()
+        while True:
+            now = utcnow()
+            while self._heap and self._heap[0][0] <= now:
+                deadline, tournament_id = heapq.heappop(self._heap)
+                if self._deadlines.get(tournament_id) != deadline:
+                    continue
+                del self._deadlines[tournament_id]
+                self._closing[tournament_id] = asyncio.create_task(self._close(tournament_id))
+
+            if now >= next_reload:
+                interval = self.reload_interval
+                try:
+                    await self.reload()
+                except Exception:
+                    logger.warning("Reloading sign-up deadlines failed", exc_info=True)
+                    interval = min(interval, SCHEDULER_RETRY_DELAY)
+                next_reload = utcnow() + timedelta(seconds=interval)
+                continue
+
+            wake_at = min(self._heap[0][0], next_reload) if self._heap else next_reload
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), (wake_at - now).total_seconds())
+            except asyncio.TimeoutError:
+                pass
+
+    async def _close(self, tournament_id):
+        try:
+            async with self._semaphore:
+                if not await _acquire_close_lease(tournament_id, self.owner):
+                    # Already closed, not provisioned yet, or being closed by another worker
+                    return
+                closed = False
+                try:
+                    async with get_async_database_session() as db:
+                        tournament = await db.get(db_tournament, tournament_id)
+                        form_link = tournament.form_link
+                    result = await asyncio.to_thread(close_signups, tournament_id, form_link)
+                    closed = True
+                    logger.info("Closed sign-ups of tournament %s", tournament_id, extra={'sync': result})
+                except Exception:
+                    logger.warning("Closing sign-ups of tournament %s failed", tournament_id, exc_info=True)
+                    self.schedule(tournament_id, utcnow() + timedelta(seconds=SCHEDULER_RETRY_DELAY))
+                finally:
+                    await _release_close_lease(tournament_id, self.owner, closed)
+        except Exception:
+            logger.exception("Sign-up close job for tournament %s crashed", tournament_id)
+        finally:
+            self._closing.pop(tournament_id, None)
+
+
+deadline_scheduler = DeadlineScheduler()
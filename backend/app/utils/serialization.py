@@ -0,0 +1,48 @@
+import json
+from datetime import date, datetime
+
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+from app.models.models import PYDANTIC_V2
+
+# Optional: several times faster than the json module and serializes dates itself
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dump_model(model):
+    return model.model_dump() if PYDANTIC_V2 else model.dict()
+
+
+def _default(value):
+    if isinstance(value, BaseModel):
+        return _dump_model(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    """Compact JSON for models and plain data, with dates as ISO 8601 like FastAPI's encoder."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, separators=(',', ':')).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class: encodes with orjson when it's installed."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def model_response(model, status_code=200, headers=None):
+    """
+    Respond with an already built model as is. FastAPI returns Response objects untouched, so the
+    model isn't validated and converted again against the route's ``response_model``; build it from
+    trusted data only, e.g. with ``from_db``.
+    """
+    return FastJSONResponse(content=model, status_code=status_code, headers=headers)
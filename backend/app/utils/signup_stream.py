@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+
+from sqlalchemy import func, select
+
+from app.db.database import get_async_database_session
+from app.models.db_models import Signup as db_signup
+from app.models.models import Signup
+from app.utils.cache import encode_json
+from app.utils.response_sync import import_tournament_responses
+
+# Seconds between two form polls of a tournament, however many clients are watching it
+SIGNUP_STREAM_POLL_INTERVAL = float(os.getenv('SIGNUP_STREAM_POLL_INTERVAL', '10'))
+# Signups buffered per client; a client that falls this far behind is disconnected
+SIGNUP_STREAM_QUEUE_SIZE = int(os.getenv('SIGNUP_STREAM_QUEUE_SIZE', '256'))
+# Seconds of silence after which a comment is sent, so proxies don't close idle streams
+SIGNUP_STREAM_HEARTBEAT = float(os.getenv('SIGNUP_STREAM_HEARTBEAT', '15'))
+# Rows read from the signups table per query when publishing or replaying
+SIGNUP_STREAM_BATCH_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+
+async def load_signups_after(tournament_id, after_id, limit=SIGNUP_STREAM_BATCH_SIZE):
+    async with get_async_database_session() as db:
+        rows = (await db.execute(
+            select(db_signup.id, db_signup.game_name, db_signup.tag_line, db_signup.submitted_at)
+            .where(db_signup.tournament_id == tournament_id, db_signup.id > after_id)
+            .order_by(db_signup.id).limit(limit)
+        )).all()
+    return [Signup.from_db(row) for row in rows]
+
+
+async def latest_signup_id(tournament_id):
+    async with get_async_database_session() as db:
+        return (await db.execute(
+            select(func.max(db_signup.id)).where(db_signup.tournament_id == tournament_id)
+        )).scalar() or 0
+
+
+def format_event(signup):
+    # The signup id doubles as the event id, so reconnecting clients resume through Last-Event-ID
+    return f"id: {signup.id}\nevent: signup\ndata: {encode_json(signup).decode()}\n\n"
+
+
+class Subscriber:
+    def __init__(self, maxsize):
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        # Set when the queue overflowed; the client is then disconnected rather than silently skipping signups
+        self.overflowed = False
+
+    def publish(self, signup):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(signup)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class SignupPoller:
+    """
+    Polls one tournament's form on behalf of every client watching it.
+
+    Each poll imports new responses into the signups table (incrementally, from the sync high-water
+    mark) and publishes the rows added since the previous poll to every subscriber.
+    """
+
+    def __init__(self, tournament_id, interval):
+        self.tournament_id = tournament_id
+        self.interval = interval
+        self.subscribers = set()
+        self.last_id = 0
+        self.task = None
+
+    async def run(self):
+        self.last_id = await latest_signup_id(self.tournament_id)
+        while True:
+            try:
+                await asyncio.to_thread(import_tournament_responses, self.tournament_id)
+                await self.publish_new_signups()
+            except Exception:
+                logger.warning("Polling signups of tournament %s failed", self.tournament_id, exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    async def publish_new_signups(self):
+        while True:
+            signups = await load_signups_after(self.tournament_id, self.last_id)
+            if not signups:
+                return
+            self.last_id = signups[-1].id
+            for signup in signups:
+                for subscriber in self.subscribers:
+                    subscriber.publish(signup)
+
+
+class SignupStreamHub:
+    """Keeps one SignupPoller per tournament that has at least one subscriber."""
+
+    def __init__(self, interval=SIGNUP_STREAM_POLL_INTERVAL, queue_size=SIGNUP_STREAM_QUEUE_SIZE):
+        self.interval = interval
+        self.queue_size = queue_size
+        self._pollers = {}
+
+    @asynccontextmanager
+    async def subscribe(self, tournament_id):
+        poller = self._pollers.get(tournament_id)
+        if poller is None:
+            poller = self._pollers[tournament_id] = SignupPoller(tournament_id, self.interval)
+            poller.task = asyncio.create_task(poller.run())
+
+        subscriber = Subscriber(self.queue_size)
+        poller.subscribers.add(subscriber)
+        try:
+            yield subscriber
+        finally:
+            poller.subscribers.discard(subscriber)
+            if not poller.subscribers and self._pollers.get(tournament_id) is poller:
+                # Last client left: stop polling the form
+                poller.task.cancel()
+                del self._pollers[tournament_id]
+
+    async def stop(self):
+        pollers = list(self._pollers.values())
+        self._pollers.clear()
+        for poller in pollers:
+            poller.task.cancel()
+        await asyncio.gather(*(poller.task for poller in pollers), return_exceptions=True)
+
+
+signup_hub = SignupStreamHub()
@@ -0,0 +1,90 @@
+import numpy as np
+
+LOBBY_SIZE = 8
+# Points for placements 1st..8th; index 0 stands for "no result" and scores nothing
+POINTS_BY_PLACEMENT = np.array([0, 8, 7, 6, 5, 4, 3, 2, 1], dtype=np.int32)
+SEEDING_METHODS = ('snake', 'swiss')
+
+
+def placement_matrix(player_ids, result_player_ids, result_rounds, result_placements, rounds):
+    """
+    Scatter (player, round, placement) rows into a players x rounds array of placements.
+
+    :param player_ids: Sorted ids of every player; row i of the result belongs to player_ids[i]
+    :param result_rounds: 1-based round numbers
+    :param result_placements: Placements 1-8, or 0 for results not reported yet
+    :return: int8 array of shape (len(player_ids), rounds), 0 where a player has no result
+    """
+    placements = np.zeros((len(player_ids), rounds), dtype=np.int8)
+    rows = np.searchsorted(player_ids, result_player_ids)
+    placements[rows, np.asarray(result_rounds) - 1] = result_placements
+    return placements
+
+
+def compute_standings(placements):
+    """
+    Score every player and rank them.
+
+    Ties on points are broken by the number of top-4 finishes, then first places, then the placement in
+    the most recent round that has results (better is higher), then by player order.
+
+    :param placements: players x rounds array as built by ``placement_matrix``
+    :return: Dictionary of per-player arrays: points, top4, firsts and last_placement (0 when the player
+        has no result in that round), and ``order``, the player rows sorted from first to last
+    """
+    placements = np.asarray(placements)
+    points = POINTS_BY_PLACEMENT[placements].sum(axis=1)
+    top4 = ((placements >= 1) & (placements <= 4)).sum(axis=1)
+    firsts = (placements == 1).sum(axis=1)
+
+    played_rounds = np.flatnonzero(placements.any(axis=0))
+    if len(played_rounds):
+        last_placement = placements[:, played_rounds[-1]].astype(np.int32)
+    else:
+        last_placement = np.zeros(len(placements), dtype=np.int32)
+    # Players without a result in the last round sort after 8th place
+    last_key = np.where(last_placement == 0, LOBBY_SIZE + 1, last_placement)
+
+    # lexsort sorts by the last key first and is stable, so full ties keep player order
+    order = np.lexsort((last_key, -firsts, -top4, -points))
+    return {
+        'order': order,
+        'points': points,
+        'top4': top4,
+        'firsts': firsts,
+        'last_placement': last_placement,
+    }
+
+
+def lobby_count(players, lobby_size=LOBBY_SIZE):
+    return max(1, -(-players // lobby_size))
+
+
+def assign_lobbies(order, method='snake', lobby_size=LOBBY_SIZE):
+    """
+    Split ranked players into lobbies of at most ``lobby_size``, with sizes differing by at most one.
+
+    'snake' deals seeds across the lobbies and back again (1..L, L..1, ...), so every lobby gets a
+    similar spread of strong and weak players. 'swiss' groups players of similar standing: the top
+    seeds play each other, then the next group, and so on.
+
+    :param order: Player rows from best to worst seed
+    :return: 0-based lobby of each player row, as an array indexed like the players
+    """
+    order = np.asarray(order)
+    players = len(order)
+    lobbies = lobby_count(players, lobby_size)
+    seeds = np.arange(players)
+
+    if method == 'snake':
+        column = seeds % lobbies
+        lobby_of_seed = np.where((seeds // lobbies) % 2 == 0, column, lobbies - 1 - column)
+    elif method == 'swiss':
+        lobby_of_seed = seeds * lobbies // players
+    else:
+        raise ValueError(f"Unknown seeding method '{method}'")
+
+    lobby = np.empty(players, dtype=np.int32)
+    lobby[order] = lobby_of_seed
+    return lobby
+
@@ -0,0 +1,105 @@
+"""
+Load test: throughput of an endpoint on the async engine versus the old blocking-session pattern.
+
+Each SQL statement gets an injected delay to stand in for a database round trip. The delay is a sleep()
+SQL function, so it runs where the driver waits for the database: aiosqlite's connection thread for the
+async endpoint, which keeps serving other requests meanwhile, and the event loop thread for the blocking
+variant, which stalls every other request on the worker.
+
+Run from the backend directory:  python -m benchmarks.bench_concurrency [clients] [requests_per_client]
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+_tmp = tempfile.mkdtemp()
+os.environ.setdefault('SECRETS_BACKEND', 'env')
+# Measure the database path, not the response cache
+os.environ.setdefault('RESPONSE_CACHE_TTL', '0')
+os.environ.setdefault('SECRET_TFT_TOURNAMENT_KEYS', json.dumps({
+    'database_url': f"sqlite:///{os.path.join(_tmp, 'bench.db')}",
+    'secret_key': 'benchmark-secret-key',
+}))
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.orm import selectinload
+
+from app.db.database import get_engine, get_async_engine, get_database_session
+from app.models.db_models import Base, User, Tournament
+from main import app
+
+QUERY_LATENCY = 0.005
+
+
+def sqlite_sleep(milliseconds):
+    time.sleep(milliseconds / 1000)
+    return 0
+
+
+def add_query_latency(sync_engine, latency):
+    # Must be added before the engine opens its first connection, so every connection gets sleep()
+    @event.listens_for(sync_engine, 'connect')
+    def register_sleep(dbapi_connection, connection_record):
+        dbapi_connection.create_function('sleep', 1, sqlite_sleep)
+
+    @event.listens_for(sync_engine, 'before_cursor_execute')
+    def delay(conn, cursor, statement, parameters, context, executemany):
+        # Through the driver's cursor: a time.sleep() here would run on the event loop for both engines
+        cursor.execute('SELECT sleep(?)', (latency * 1000,))
+
+
+def seed():
+    Base.metadata.create_all(get_engine())
+    with get_database_session() as db:
+        user = User(username='loadtest', password='x', email='loadtest@example.com')
+        for i in range(20):
+            user.tournaments.append(Tournament(
+                name=f'Tournament {i}', sheets_link='s', form_link='f', sign_up_deadline=datetime(2026, 1, 1),
+                start_date=date(2026, 1, 2), end_date=date(2026, 1, 3)))
+        db.add(user)
+        db.commit()
+
+
+@app.get('/bench/blocking/users/{username}')
+async def blocking_user_profile(username: str):
+    # The pre-async pattern: a sync session used directly inside an async endpoint
+    with get_database_session() as db:
+        user = db.query(User).options(selectinload(User.tournaments)).filter(User.username == username).first()
+        return {'username': user.username, 'tournaments': [t.id for t in user.tournaments]}
+
+
+async def run_clients(path, clients, requests_per_client):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        async def worker():
+            for _ in range(requests_per_client):
+                response = await client.get(path)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        return clients * requests_per_client / (time.perf_counter() - start)
+
+
+async def main(clients=100, requests_per_client=5):
+    add_query_latency(get_engine(), QUERY_LATENCY)
+    add_query_latency(get_async_engine().sync_engine, QUERY_LATENCY)
+    seed()
+
+    blocking = await run_clients('/bench/blocking/users/loadtest', clients, requests_per_client)
+    concurrent = await run_clients('/users/loadtest', clients, requests_per_client)
+
+    print(f"{clients} concurrent clients, {requests_per_client} requests each, "
+          f"{QUERY_LATENCY * 1000:.0f} ms per query")
+    print(f"Blocking session:  {blocking:8.1f} req/s")
+    print(f"Async session:     {concurrent:8.1f} req/s  ({concurrent / blocking:.1f}x)")
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:3]]
+    asyncio.run(main(*args))
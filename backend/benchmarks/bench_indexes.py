@@ -0,0 +1,94 @@
+"""
+Seed SQLite with 1M users and compare lookup latency without and with the indexes from migration 0003.
+
+Run from the backend directory:  python -m benchmarks.bench_indexes [user_count]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.db import create_sqlite_engine
+
+from sqlalchemy import select
+from app.models.db_models import Base, User, Tournament, user_tournaments
+
+INDEXED_TABLES = ['users', 'tournaments', 'user_tournaments']
+BATCH_SIZE = 50000
+
+
+def drop_indexes(engine):
+    for table in INDEXED_TABLES:
+        for index in Base.metadata.tables[table].indexes:
+            index.drop(engine)
+
+
+def create_indexes(engine):
+    for table in INDEXED_TABLES:
+        for index in Base.metadata.tables[table].indexes:
+            index.create(engine)
+
+
+def seed(engine, user_count):
+    tournament_count = max(user_count // 10, 1)
+    with engine.begin() as conn:
+        for start in range(0, user_count, BATCH_SIZE):
+            conn.execute(User.__table__.insert(), [
+                {'username': f'user{i}', 'password': 'x', 'email': f'user{i}@example.com'}
+                for i in range(start, min(start + BATCH_SIZE, user_count))
+            ])
+        conn.execute(Tournament.__table__.insert(), [
+            {'name': f'Tournament {i}', 'sign_up_deadline': None, 'start_date': None, 'end_date': None}
+            for i in range(tournament_count)
+        ])
+        conn.execute(user_tournaments.insert(), [
+            {'user_id': i + 1, 'tournament_id': i % tournament_count + 1} for i in range(user_count)
+        ])
+    return tournament_count
+
+
+def time_lookups(engine, user_count, tournament_count, lookups):
+    rng = random.Random(0)
+    queries = {
+        'users.username': lambda: select(User.id).where(User.username == f'user{rng.randrange(user_count)}'),
+        'users.email': lambda: select(User.id).where(User.email == f'user{rng.randrange(user_count)}@example.com'),
+        'tournaments.name': lambda: select(Tournament.id).where(
+            Tournament.name == f'Tournament {rng.randrange(tournament_count)}'),
+        'user_tournaments.tournament_id': lambda: select(user_tournaments.c.user_id).where(
+            user_tournaments.c.tournament_id == rng.randrange(tournament_count) + 1),
+    }
+    results = {}
+    with engine.connect() as conn:
+        for name, build_query in queries.items():
+            start = time.perf_counter()
+            for _ in range(lookups):
+                conn.execute(build_query()).all()
+            results[name] = (time.perf_counter() - start) / lookups
+    return results
+
+
+def main(user_count=1_000_000, lookups=20):
+    with tempfile.TemporaryDirectory() as tmp:
+        # NOT NULL dates don't matter for lookups, so the seed skips them via a relaxed schema
+        for column in ('sign_up_deadline', 'start_date', 'end_date'):
+            Tournament.__table__.c[column].nullable = True
+        engine = create_sqlite_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        drop_indexes(engine)
+
+        start = time.perf_counter()
+        tournament_count = seed(engine, user_count)
+        print(f"Seeded {user_count:,} users in {time.perf_counter() - start:.1f} s")
+
+        before = time_lookups(engine, user_count, tournament_count, lookups)
+        create_indexes(engine)
+        after = time_lookups(engine, user_count, tournament_count, lookups)
+
+        print(f"{'lookup':32} {'no index':>12} {'indexed':>12}")
+        for name in before:
+            print(f"{name:32} {before[name] * 1000:9.3f} ms {after[name] * 1000:9.3f} ms")
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,62 @@
+"""
+Logging overhead on the request path: cost per call of a disabled debug statement (f-string vs lazy arguments)
+and of an emitted record written inline by a StreamHandler vs handed to the queue writer thread.
+
+Output goes to a stream that blocks for WRITE_LATENCY per write, standing in for a busy pipe or log shipper.
+
+Run from the backend directory:  python -m benchmarks.bench_logging [calls]
+"""
+import logging
+import sys
+import time
+
+from app.core.log import JsonFormatter, configure_logging, shutdown_logging
+
+WRITE_LATENCY = 0.0002
+PAYLOAD = {'sub': 'player', 'uid': 1, 'email': 'player@example.com', 'exp': 1700000000}
+
+
+class SlowStream:
+    def write(self, text):
+        time.sleep(WRITE_LATENCY)
+
+    def flush(self):
+        pass
+
+
+def per_call(func, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main(calls=100000):
+    logger = logging.getLogger('bench')
+    stream = SlowStream()
+
+    configure_logging(level='INFO', log_format='json', stream=stream)
+    eager = per_call(lambda: logger.debug(f"Decoded payload: {PAYLOAD}"), calls)
+    lazy = per_call(lambda: logger.debug("Decoded payload: %s", PAYLOAD), calls)
+    queued = per_call(lambda: logger.info("Token created for %s", PAYLOAD['sub'], extra={'uid': 1}), calls // 10)
+    shutdown_logging()
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    inline_handler = logging.StreamHandler(stream)
+    inline_handler.setFormatter(JsonFormatter())
+    root.addHandler(inline_handler)
+    inline = per_call(lambda: logger.info("Token created for %s", PAYLOAD['sub'], extra={'uid': 1}), calls // 10)
+    root.removeHandler(inline_handler)
+
+    print(f"{WRITE_LATENCY * 1e6:.0f} us per write")
+    print(f"Disabled debug, f-string:      {eager:7.2f} us/call")
+    print(f"Disabled debug, lazy args:     {lazy:7.2f} us/call")
+    print(f"Emitted, inline JSON handler:  {inline:7.2f} us/call")
+    print(f"Emitted, queue handler:        {queued:7.2f} us/call")
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:2]]
+    main(*args)
@@ -0,0 +1,64 @@
+"""
+Mixed login and read traffic: read latency while logins verify bcrypt hashes inline vs on the hashing pool.
+
+Run from the backend directory:  python -m benchmarks.bench_password_hashing [logins] [readers]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+from app.core.security import PasswordHasher, pwd_context
+
+PASSWORD = 'correct horse battery staple'
+
+
+async def reader(latencies, stop):
+    # Stands in for a cheap read endpoint: measures how long it waits to get scheduled
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        latencies.append(time.perf_counter() - start - 0.001)
+
+
+async def run(login, logins, readers):
+    hashed = pwd_context.hash(PASSWORD)
+    latencies = []
+    stop = asyncio.Event()
+    reader_tasks = [asyncio.create_task(reader(latencies, stop)) for _ in range(readers)]
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(login(hashed) for _ in range(logins)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await asyncio.gather(*reader_tasks)
+    rejected = sum(isinstance(result, Exception) for result in results)
+    return elapsed, latencies, rejected
+
+
+def percentile(values, pct):
+    return statistics.quantiles(values, n=100)[pct - 1] if len(values) > 1 else values[0]
+
+
+async def main(logins=50, readers=20):
+    async def inline_login(hashed):
+        await asyncio.sleep(0)
+        return pwd_context.verify_and_update(PASSWORD, hashed)
+
+    hasher = PasswordHasher()
+
+    async def pooled_login(hashed):
+        return await hasher.verify_and_update(PASSWORD, hashed)
+
+    print(f"{logins} concurrent logins, {readers} concurrent readers, schemes={pwd_context.schemes()}")
+    for name, login in (('inline', inline_login), ('hash pool', pooled_login)):
+        elapsed, latencies, rejected = await run(login, logins, readers)
+        print(f"{name:10} logins {logins / elapsed:7.1f}/s  read p50 {percentile(latencies, 50) * 1000:7.2f} ms  "
+              f"p99 {percentile(latencies, 99) * 1000:7.2f} ms  rejected {rejected}")
+    hasher.shutdown()
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:3]]
+    asyncio.run(main(*args))
@@ -0,0 +1,74 @@
+"""
+Compare the sequential Google provisioning of /create_tournament with the concurrent pipeline.
+
+The Google clients are replaced by FakeGoogleBackend, so the real helpers, batching and error handling
+run and only the round trips are simulated.
+
+Run from the backend directory:  python -m benchmarks.bench_provisioning [latency_seconds]
+"""
+import asyncio
+import sys
+import time
+
+from benchmarks.fakes import FakeGoogleBackend
+
+from app.utils import provisioning
+from app.utils.google_clients import registry, rate_limiters, TokenBucket
+from app.utils.google_services import create_google_sheet, create_google_form
+
+GOOGLE_CREDS = {'client_email': 'bench@example.com', 'private_key_id': 'bench'}
+USER_EMAIL = 'organizer@example.com'
+
+
+class FailingFormQuestions(FakeGoogleBackend):
+    """Backend whose Forms batchUpdate always fails, so the pipeline has files to clean up."""
+
+    def _batch_update(self, form_id, body):
+        raise RuntimeError("Fake Forms API failure adding the questions")
+
+
+def provision_sequentially(name):
+    # What /create_tournament did before the pipeline: the sheet, then the form, one call at a time
+    sheet_id = create_google_sheet(f"Tournament: {name}", GOOGLE_CREDS, USER_EMAIL)
+    form_id = create_google_form(f"Tournament Sign-Up: {name}", GOOGLE_CREDS, USER_EMAIL)
+    return sheet_id, form_id
+
+
+def main(latency=0.1, runs=5):
+    # Only the simulated latency is measured, not the production rate limits
+    for api in rate_limiters:
+        rate_limiters[api] = TokenBucket(rate=1000, capacity=100)
+
+    backend = FakeGoogleBackend(latency=latency)
+    backend.install(registry)
+    start = time.perf_counter()
+    for i in range(runs):
+        provision_sequentially(f"seq-{i}")
+    sequential = (time.perf_counter() - start) / runs
+    sequential_round_trips = backend.round_trips / runs
+
+    backend.round_trips = 0
+    start = time.perf_counter()
+    for i in range(runs):
+        asyncio.run(provisioning.provision_google_files(f"pipe-{i}", GOOGLE_CREDS, USER_EMAIL))
+    pipelined = (time.perf_counter() - start) / runs
+    pipelined_round_trips = backend.round_trips / runs
+
+    failing = FailingFormQuestions(latency=latency)
+    failing.install(registry)
+    start = time.perf_counter()
+    try:
+        asyncio.run(provisioning.provision_google_files('fail', GOOGLE_CREDS, USER_EMAIL))
+    except RuntimeError:
+        pass
+    failure = time.perf_counter() - start
+
+    print(f"Injected latency per Google round trip: {latency * 1000:.0f} ms")
+    print(f"Sequential provisioning:  {sequential * 1000:8.1f} ms  ({sequential_round_trips:.0f} round trips)")
+    print(f"Concurrent pipeline:      {pipelined * 1000:8.1f} ms  ({pipelined_round_trips:.0f} round trips, "
+          f"{sequential / pipelined:.1f}x faster)")
+    print(f"Failure + cleanup:        {failure * 1000:8.1f} ms  (orphaned files: {len(failing.files)})")
+
+
+if __name__ == '__main__':
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 0.1)
@@ -0,0 +1,92 @@
+"""
+Serialization of the GET /users/{username} body at 1k tournaments, from loaded ORM objects to JSON bytes.
+
+Compares the former path (validated models, then FastAPI's jsonable_encoder and json.dumps) with trusted
+construction through ``from_db`` and app.utils.serialization.dumps (orjson when installed), and with the
+compact column/row encoding. The outputs are checked to decode to the same data.
+
+Run from the backend directory:  python -m benchmarks.bench_serialization [tournaments]
+"""
+import asyncio
+import json
+import sys
+import time
+
+from benchmarks.db import create_async_sqlite_engine, async_session_factory
+from benchmarks.bench_user_profile import seed
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.models.db_models import User as db_user, Tournament as db_tournament
+from app.models.models import Tournament, UserProfile, CompactUserProfile
+from app.utils.serialization import dumps, orjson
+
+
+def legacy_profile(user):
+    # What load_user_profile and encode_json did before: every field validated, then encoded generically
+    profile = UserProfile(username=user.username, email=user.email, tournaments=[
+        Tournament(
+            id=tournament.id, name=tournament.name, sheets_link=tournament.sheets_link,
+            form_link=tournament.form_link, sign_up_deadline=tournament.sign_up_deadline,
+            start_date=tournament.start_date, end_date=tournament.end_date,
+            organizers=[organizer.username for organizer in tournament.organizers],
+        )
+        for tournament in user.tournaments
+    ])
+    return json.dumps(jsonable_encoder(profile), separators=(',', ':')).encode()
+
+
+def trusted_profile(user):
+    return UserProfile.construct_trusted(username=user.username, email=user.email,
+                                         tournaments=[Tournament.from_db(tournament) for tournament in user.tournaments])
+
+
+def fast_profile(user):
+    return dumps(trusted_profile(user))
+
+
+def compact_profile(user):
+    return dumps(CompactUserProfile.from_profile(trusted_profile(user)))
+
+
+def timed(func, user, runs):
+    func(user)
+    start = time.perf_counter()
+    for _ in range(runs):
+        body = func(user)
+    return (time.perf_counter() - start) / runs, body
+
+
+async def load_user(AsyncSessionLocal, username):
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(
+            select(db_user).options(selectinload(db_user.tournaments).joinedload(db_tournament.organizers))
+            .where(db_user.username == username)
+        )).scalars().first()
+
+
+async def main(tournaments=1000, runs=50):
+    engine = await create_async_sqlite_engine()
+    username = await seed(async_session_factory(engine), tournaments)
+    user = await load_user(async_session_factory(engine), username)
+    await engine.dispose()
+
+    print(f"{tournaments} tournaments, encoder: {'orjson' if orjson else 'json'}")
+    legacy_seconds, legacy_body = timed(legacy_profile, user, runs)
+    expected = json.loads(legacy_body)
+    for name, func in (('validated + jsonable_encoder', legacy_profile), ('from_db + dumps', fast_profile),
+                       ('from_db + dumps, compact', compact_profile)):
+        seconds, body = timed(func, user, runs)
+        decoded = json.loads(body)
+        if func is compact_profile:
+            columns = decoded['tournaments']['columns']
+            decoded['tournaments'] = [dict(zip(columns, row)) for row in decoded['tournaments']['rows']]
+        assert decoded == expected, f"{name} doesn't encode the same profile"
+        print(f"  {name:<30} {seconds * 1000:7.2f} ms  {len(body) / 1024:7.1f} KiB  "
+              f"{legacy_seconds / seconds:5.1f}x")
+
+
+if __name__ == '__main__':
+    asyncio.run(main(*map(int, sys.argv[1:2])))
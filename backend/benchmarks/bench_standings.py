@@ -0,0 +1,81 @@
+"""
+Standings engine at event scale: full recomputation of points, tiebreakers and reseeding for
+10k players x 10 rounds, against a straightforward pure-Python implementation.
+
+Run from the backend directory:  python -m benchmarks.bench_standings [players] [rounds]
+"""
+import sys
+import time
+
+import numpy as np
+
+from app.utils.standings import LOBBY_SIZE, POINTS_BY_PLACEMENT, placement_matrix, compute_standings, assign_lobbies
+
+
+def simulate(players, rounds, seed=0):
+    """Play ``rounds`` snake-seeded rounds with random finishing orders, returning result rows like the DB's."""
+    rng = np.random.default_rng(seed)
+    player_ids = np.arange(1, players + 1) * 3
+    placements = np.zeros((players, 0), dtype=np.int8)
+    rows = []
+    for round_number in range(1, rounds + 1):
+        order = compute_standings(placements)['order'] if round_number > 1 else np.arange(players)
+        lobby = assign_lobbies(order, 'snake')
+        # Random finishing order within each lobby: sort by (lobby, random key), then count up within lobbies
+        finish = np.lexsort((rng.random(players), lobby))
+        lobby_sorted = lobby[finish]
+        starts = np.searchsorted(lobby_sorted, lobby_sorted)
+        placement = np.empty(players, dtype=np.int8)
+        placement[finish] = np.arange(players) - starts + 1
+        placements = np.column_stack([placements, placement])
+        rows.append(np.column_stack([player_ids, np.full(players, round_number), placement]))
+    return player_ids, np.concatenate(rows)
+
+
+def python_standings(player_ids, rows):
+    points = {player_id: [0, 0, 0, {}] for player_id in player_ids.tolist()}
+    for player_id, round_number, placement in rows.tolist():
+        stats = points[player_id]
+        stats[0] += int(POINTS_BY_PLACEMENT[placement])
+        stats[1] += placement <= 4
+        stats[2] += placement == 1
+        stats[3][round_number] = placement
+    last_round = int(rows[:, 1].max())
+    return sorted(points, key=lambda player_id: (-points[player_id][0], -points[player_id][1], -points[player_id][2],
+                                                 points[player_id][3].get(last_round, LOBBY_SIZE + 1)))
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main(players=10000, rounds=10, repeat=20):
+    player_ids, rows = simulate(players, rounds)
+
+    matrix_ms, placements = timed(lambda: placement_matrix(player_ids, rows[:, 0], rows[:, 1], rows[:, 2], rounds),
+                                  repeat)
+    standings_ms, standings = timed(lambda: compute_standings(placements), repeat)
+    snake_ms, _ = timed(lambda: assign_lobbies(standings['order'], 'snake'), repeat)
+    swiss_ms, _ = timed(lambda: assign_lobbies(standings['order'], 'swiss'), repeat)
+    python_ms, python_order = timed(lambda: python_standings(player_ids, rows), max(1, repeat // 10))
+
+    assert player_ids[standings['order']].tolist() == python_order, "NumPy and reference rankings differ"
+    lobby_sizes = np.bincount(assign_lobbies(standings['order'], 'swiss'))
+    assert lobby_sizes.max() <= LOBBY_SIZE and lobby_sizes.max() - lobby_sizes.min() <= 1
+
+    print(f"{players} players x {rounds} rounds ({len(rows)} results)")
+    print(f"Scatter results into matrix:  {matrix_ms:8.2f} ms")
+    print(f"Points and tiebreakers:       {standings_ms:8.2f} ms")
+    print(f"Snake reseeding:              {snake_ms:8.2f} ms")
+    print(f"Swiss reseeding:              {swiss_ms:8.2f} ms")
+    print(f"Full recompute (NumPy):       {matrix_ms + standings_ms + snake_ms:8.2f} ms")
+    print(f"Pure Python standings:        {python_ms:8.2f} ms  "
+          f"({python_ms / (matrix_ms + standings_ms):.0f}x slower)")
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:3]]
+    main(*args)
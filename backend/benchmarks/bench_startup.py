@@ -0,0 +1,89 @@
+"""
+Cold start: time to import the app, time until the lifespan startup completes, and latency of the first request,
+with lazy initialisation versus warming secrets and the database during startup.
+
+Every run is a fresh interpreter. Secret lookups get an injected delay to stand in for a Secrets Manager round trip.
+
+Run from the backend directory:  python -m benchmarks.bench_startup [runs] [secret_latency_ms]
+"""
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = {
+    'lazy': '',
+    'warmup': 'secrets,database',
+}
+
+
+def child(secret_latency):
+    import_start = time.perf_counter()
+    from app.utils.get_secret import EnvSecretsProvider, configure_secrets
+
+    class SlowProvider(EnvSecretsProvider):
+        def fetch(self, secret_name, region_name):
+            time.sleep(secret_latency)
+            return super().fetch(secret_name, region_name)
+
+    configure_secrets(SlowProvider())
+    from main import app
+    import_seconds = time.perf_counter() - import_start
+
+    import httpx
+
+    async def run():
+        async with app.router.lifespan_context(app):
+            startup_seconds = time.perf_counter() - import_start - import_seconds
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+                start = time.perf_counter()
+                response = await client.get('/tournaments')
+                response.raise_for_status()
+                first_request_seconds = time.perf_counter() - start
+        return startup_seconds, first_request_seconds
+
+    startup_seconds, first_request_seconds = asyncio.run(run())
+    print(json.dumps({'import': import_seconds, 'startup': startup_seconds, 'first_request': first_request_seconds}))
+
+
+def run_child(warmup, database_url, secret_latency):
+    env = dict(os.environ, SECRETS_BACKEND='env', STARTUP_WARMUP=warmup, SECRET_TFT_TOURNAMENT_KEYS=json.dumps({
+        'database_url': database_url,
+        'secret_key': 'benchmark-secret-key',
+    }), SECRET_GOOGLE_SHEETS_KEY=json.dumps({'client_email': 'bench@example.com', 'private_key_id': 'bench'}))
+    output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_startup', '--child', str(secret_latency)],
+                            env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(runs=5, secret_latency_ms=100):
+    from sqlalchemy import create_engine
+    from app.models.db_models import Base
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_engine(database_url)
+        Base.metadata.create_all(engine)
+        engine.dispose()
+
+        print(f"{runs} cold starts per mode, {secret_latency_ms} ms per secret lookup (median ms)")
+        print(f"{'mode':<8} {'import':>8} {'startup':>8} {'first request':>14} {'total':>8}")
+        for mode, warmup in MODES.items():
+            results = [run_child(warmup, database_url, secret_latency_ms / 1000) for _ in range(runs)]
+            medians = {phase: statistics.median(result[phase] for result in results) * 1000
+                       for phase in ('import', 'startup', 'first_request')}
+            print(f"{mode:<8} {medians['import']:8.1f} {medians['startup']:8.1f} "
+                  f"{medians['first_request']:14.1f} {sum(medians.values()):8.1f}")
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--child']:
+        child(float(sys.argv[2]))
+    else:
+        args = [int(arg) for arg in sys.argv[1:3]]
+        main(*args)
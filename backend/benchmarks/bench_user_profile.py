@@ -0,0 +1,62 @@
+"""
+Benchmark GET /users/{username} at 1, 50 and 500 tournaments per user and report its query count.
+
+The query count is asserted by tests/test_user_profile.py.
+
+Run from the backend directory:  python -m benchmarks.bench_user_profile
+"""
+import asyncio
+import time
+from datetime import date, datetime
+
+from benchmarks.db import QueryCounter, create_async_sqlite_engine, async_session_factory
+
+from app.endpoints import users
+from app.models.db_models import User, Tournament
+
+
+async def seed(AsyncSessionLocal, tournaments_per_user):
+    async with AsyncSessionLocal() as db:
+        owner = User(username=f'owner{tournaments_per_user}', password='x', email=f'owner{tournaments_per_user}@example.com')
+        co_organizer = User(username=f'co{tournaments_per_user}', password='x', email=f'co{tournaments_per_user}@example.com')
+        for i in range(tournaments_per_user):
+            owner.tournaments.append(Tournament(
+                name=f'Tournament {i}',
+                sheets_link='https://docs.google.com/spreadsheets/d/sheet/edit',
+                form_link='https://docs.google.com/forms/d/form/edit',
+                sign_up_deadline=datetime(2026, 1, 1),
+                start_date=date(2026, 1, 2),
+                end_date=date(2026, 1, 3),
+                organizers=[co_organizer],
+            ))
+        db.add(owner)
+        await db.commit()
+        return owner.username
+
+
+async def main(sizes=(1, 50, 500), runs=20):
+    engine = await create_async_sqlite_engine()
+    AsyncSessionLocal = async_session_factory(engine)
+    counter = QueryCounter(engine.sync_engine)
+
+    for size in sizes:
+        username = await seed(AsyncSessionLocal, size)
+
+        counter.reset()
+        async with AsyncSessionLocal() as db:
+            profile = await users.load_user_profile(db, username)
+        queries = counter.count
+        assert len(profile.tournaments) == size
+
+        start = time.perf_counter()
+        for _ in range(runs):
+            async with AsyncSessionLocal() as db:
+                await users.load_user_profile(db, username)
+        elapsed = (time.perf_counter() - start) / runs
+        print(f"{size:4d} tournaments: {queries} queries, {elapsed * 1000:7.2f} ms per profile")
+
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+import json
+import os
+from contextlib import contextmanager
+
+# Let app.db.database boot without AWS; must run before any app module is imported
+os.environ.setdefault('SECRETS_BACKEND', 'env')
+os.environ.setdefault('SECRET_TFT_TOURNAMENT_KEYS', json.dumps({
+    'database_url': 'sqlite://',
+    'secret_key': 'benchmark-secret-key',
+}))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.db_models import Base
+
+
+class QueryCounter:
+    """Counts the SQL statements an engine executes."""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+
+    def _before_cursor_execute(self, *args):
+        self.count += 1
+
+    def reset(self):
+        self.count = 0
+
+
+def create_sqlite_engine(url='sqlite://'):
+    # A single shared connection keeps an in-memory database alive across sessions
+    engine = create_engine(url, connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+async def create_async_sqlite_engine(url='sqlite+aiosqlite://'):
+    if url == 'sqlite+aiosqlite://':
+        engine = create_async_engine(url, connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    else:
+        engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine
+
+
+def async_session_factory(engine):
+    return async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+def session_factory(engine):
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    @contextmanager
+    def get_database_session():
+        session = SessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    return SessionLocal, get_database_session
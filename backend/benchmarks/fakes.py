@@ -0,0 +1,220 @@
+"""
+In-process fakes for Secrets Manager and the Drive, Forms and Sheets clients.
+
+The Google fakes stand in for the discovery services and gspread client handed out by
+app.utils.google_clients.registry, so the google_services helpers, rate limiting, batching, retries and
+response pagination all run for real. Every round trip sleeps for ``latency``.
+"""
+import itertools
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+
+class FakeSecretsProvider:
+    """Secrets provider serving a fixed {name: {...}} mapping after ``latency`` seconds."""
+
+    def __init__(self, secrets, latency=0.0):
+        self.secrets = secrets
+        self.latency = latency
+        self.fetches = 0
+
+    def fetch(self, secret_name, region_name):
+        time.sleep(self.latency)
+        self.fetches += 1
+        return dict(self.secrets[secret_name])
+
+
+class FakeRequest:
+    def __init__(self, backend, func):
+        self.backend = backend
+        self.func = func
+
+    def execute(self):
+        self.backend.round_trip()
+        return self.func()
+
+
+class FakeBatch:
+    def __init__(self, backend, callback):
+        self.backend = backend
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        # One round trip for the whole batch
+        self.backend.round_trip()
+        for request_id, request in self.requests:
+            try:
+                response, error = request.func(), None
+            except Exception as e:
+                response, error = None, e
+            self.callback(request_id, response, error)
+
+
+class _Resource:
+    def __init__(self, **methods):
+        self.__dict__.update(methods)
+
+
+class FakeWorksheet:
+    def __init__(self, backend, rows):
+        self.backend = backend
+        self.rows = rows
+
+    def get_all_values(self):
+        self.backend.round_trip()
+        return [list(row) for row in self.rows]
+
+    def get_all_records(self):
+        self.backend.round_trip()
+        if not self.rows:
+            return []
+        headers = self.rows[0]
+        return [dict(zip(headers, row)) for row in self.rows[1:]]
+
+    def append_rows(self, rows, value_input_option=None, table_range=None):
+        self.backend.round_trip()
+        with self.backend.lock:
+            self.rows.extend(list(row) for row in rows)
+
+
+class FakeSpreadsheet:
+    def __init__(self, backend, sheet_id):
+        self.backend = backend
+        self.id = sheet_id
+
+    def worksheet(self, title):
+        return FakeWorksheet(self.backend, self.backend.sheets[self.id])
+
+
+class FakeGoogleBackend:
+    """
+    Shared state of the fake Google APIs: files, form questions and responses, and sheet rows.
+
+    :param latency: Seconds every API round trip (including a whole batch) takes
+    """
+
+    def __init__(self, latency=0.05):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.files = set()
+        self.forms = {}
+        self.sheets = {}
+        self.round_trips = 0
+        self._ids = itertools.count(1)
+
+    def round_trip(self):
+        time.sleep(self.latency)
+        with self.lock:
+            self.round_trips += 1
+
+    def _new_id(self, prefix):
+        with self.lock:
+            file_id = f"{prefix}-{next(self._ids)}"
+            self.files.add(file_id)
+        return file_id
+
+    # Drive
+
+    def _delete_file(self, file_id):
+        with self.lock:
+            self.files.discard(file_id)
+            self.forms.pop(file_id, None)
+            self.sheets.pop(file_id, None)
+        return {}
+
+    def drive_service(self):
+        return _Resource(
+            files=lambda: _Resource(delete=lambda fileId: FakeRequest(self, lambda: self._delete_file(fileId))),
+            permissions=lambda: _Resource(create=lambda fileId, body: FakeRequest(self, lambda: {'id': 'permission'})),
+            new_batch_http_request=lambda callback: FakeBatch(self, callback),
+        )
+
+    # Forms
+
+    def _create_form(self, body):
+        form_id = self._new_id('form')
+        self.forms[form_id] = {'info': body.get('info', {}), 'items': [], 'responses': [], 'accepting_responses': True}
+        return {'formId': form_id}
+
+    def _batch_update(self, form_id, body):
+        form = self.forms[form_id]
+        for request in body.get('requests', []):
+            item = dict(request['createItem']['item'])
+            item['questionItem'] = {'question': dict(item['questionItem']['question'],
+                                                     questionId=f"q{len(form['items'])}")}
+            form['items'].append(item)
+        return {}
+
+    def _set_publish_settings(self, form_id, body):
+        accepting = body['publishSettings']['publishState']['isAcceptingResponses']
+        self.forms[form_id]['accepting_responses'] = accepting
+        return {'publishSettings': {'publishState': {'isPublished': True, 'isAcceptingResponses': accepting}}}
+
+    def _list_responses(self, formId, pageSize, filter=None, pageToken=None):
+        responses = self.forms[formId]['responses']
+        if filter:
+            _, operator, since = filter.split()
+            responses = [response for response in responses if response['lastSubmittedTime'] > since
+                         or (operator == '>=' and response['lastSubmittedTime'] == since)]
+        start = int(pageToken or 0)
+        page = {'responses': responses[start:start + pageSize]}
+        if start + pageSize < len(responses):
+            page['nextPageToken'] = str(start + pageSize)
+        return page
+
+    def forms_service(self):
+        responses = _Resource(list=lambda **kwargs: FakeRequest(self, lambda: self._list_responses(**kwargs)))
+        return _Resource(forms=lambda: _Resource(
+            create=lambda body: FakeRequest(self, lambda: self._create_form(body)),
+            batchUpdate=lambda formId, body: FakeRequest(self, lambda: self._batch_update(formId, body)),
+            get=lambda formId: FakeRequest(self, lambda: {'formId': formId, 'items': self.forms[formId]['items']}),
+            setPublishSettings=lambda formId, body: FakeRequest(self, lambda: self._set_publish_settings(formId, body)),
+            responses=lambda: responses,
+        ))
+
+    def add_responses(self, form_id, count, start=None):
+        """Submit ``count`` responses to a form, one second apart, with unique game names."""
+        form = self.forms[form_id]
+        questions = {item['title']: item['questionItem']['question']['questionId'] for item in form['items']}
+        start = start or datetime(2024, 1, 1, tzinfo=timezone.utc)
+        offset = len(form['responses'])
+        for i in range(offset, offset + count):
+            submitted = (start + timedelta(seconds=i)).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+            form['responses'].append({
+                'responseId': f"{form_id}-response-{i}",
+                'lastSubmittedTime': submitted,
+                'answers': {
+                    questions['Game Name']: {'textAnswers': {'answers': [{'value': f"player{i}"}]}},
+                    questions['Tag Line']: {'textAnswers': {'answers': [{'value': 'EUW'}]}},
+                },
+            })
+
+    # Sheets, through gspread
+
+    def _create_spreadsheet(self, title):
+        sheet_id = self._new_id('sheet')
+        self.sheets[sheet_id] = []
+        return FakeSpreadsheet(self, sheet_id)
+
+    def _open_spreadsheet(self, sheet_id):
+        self.round_trip()
+        return FakeSpreadsheet(self, sheet_id)
+
+    def gspread_client(self):
+        def create(title):
+            self.round_trip()
+            return self._create_spreadsheet(title)
+
+        return _Resource(create=create, open_by_key=self._open_spreadsheet)
+
+    def install(self, registry):
+        """Make ``registry`` hand out the fake services instead of building real clients."""
+        services = {'drive': self.drive_service(), 'forms': self.forms_service()}
+        gspread_client = self.gspread_client()
+        registry.get_service = lambda api, version, google_creds, scopes: services[api]
+        registry.get_gspread_client = lambda google_creds, scopes=None: gspread_client
@@ -1,12 +1,41 @@
+import time
+
+_import_started = time.perf_counter()
+
+import logging
 import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 from starlette.responses import Response
 from starlette.staticfiles import StaticFiles
 
-from app.endpoints import auth, create_tournament, get_tournament, users, manage_tournament
+from app.core.context import app_context
+from app.core.log import configure_logging, request_id_middleware
+from app.core.metrics import metrics_middleware
+from app.endpoints import auth, create_tournament, get_tournament, list_tournaments, users, manage_tournament, metrics, rounds, \
+    export
+from app.utils.serialization import FastJSONResponse
+
+import_seconds = time.perf_counter() - _import_started
+
+configure_logging()
+logger = logging.getLogger(__name__)
+
 
-app = FastAPI(title='TFT Tournament Helper API', version='1.0', description='API for managing TFT tournaments')
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info('Starting up...')
+    await app_context.startup(import_seconds=import_seconds)
+    yield
+    logger.info('Shutting down...')
+    await app_context.shutdown()
+
+
+app = FastAPI(title='TFT Tournament Helper API', version='1.0', description='API for managing TFT tournaments',
+              lifespan=lifespan, default_response_class=FastJSONResponse)
+app.state.context = app_context
 
 # Configure CORS middleware
 app.add_middleware(
@@ -20,24 +49,23 @@ app.add_middleware(
     allow_methods=["*"],  # Allowing all methods
     allow_headers=["*"],  # Allowing all headers
 )
+app.middleware('http')(metrics_middleware)
+# Added last so it runs first and the request id is set for everything below it
+app.middleware('http')(request_id_middleware)
 
 
 app.include_router(auth.router)
 app.include_router(create_tournament.router)
+# Before get_tournament, whose /tournament/{id}/{tournament_name} route would shadow /tournament/{id}/standings
+app.include_router(rounds.router)
+app.include_router(export.router)
 app.include_router(get_tournament.router)
+app.include_router(list_tournaments.router)
 app.include_router(manage_tournament.router)
 app.include_router(users.router)
+app.include_router(metrics.router)
 
 
-@app.on_event('startup')
-async def startup_event():
-    print('Starting up...')
-
-
-@app.on_event('shutdown')
-async def shutdown_event():
-    print('Shutting down...')
-
 # Run the app with Uvicorn if this file is executed directly
 if __name__ == "__main__":
     import uvicorn
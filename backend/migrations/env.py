@@ -0,0 +1,47 @@
+import os
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+from app.models.db_models import Base
+from app.utils.get_secret import get_secret
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def get_url():
+    # Allow pointing migrations at another database without touching the secret
+    return os.getenv('DATABASE_URL') or get_secret('tft-tournament-keys')['database_url']
+
+
+def run_migrations_offline():
+    context.configure(url=get_url(), target_metadata=target_metadata, literal_binds=True,
+                      dialect_opts={'paramstyle': 'named'}, render_as_batch=True)
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    configuration = config.get_section(config.config_ini_section, {})
+    configuration['sqlalchemy.url'] = get_url()
+    connectable = engine_from_config(configuration, prefix='sqlalchemy.', poolclass=pool.NullPool)
+
+    with connectable.connect() as connection:
+        # Batch mode lets ALTER-style migrations run on SQLite as well
+        context.configure(connection=connection, target_metadata=target_metadata, render_as_batch=True)
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
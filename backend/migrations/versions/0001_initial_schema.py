@@ -0,0 +1,50 @@
+"""Initial schema: users, tournaments and user_tournaments
+
+Databases created before migrations were introduced already have this schema;
+mark them with `alembic stamp 0001` and then run `alembic upgrade head`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('username', sa.String(), nullable=False),
+        sa.Column('password', sa.String(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+    )
+    op.create_table(
+        'tournaments',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('sheets_link', sa.String(), nullable=False),
+        sa.Column('form_link', sa.String(), nullable=False),
+        sa.Column('sign_up_deadline', sa.DateTime(), nullable=False),
+        sa.Column('start_date', sa.Date(), nullable=False),
+        sa.Column('end_date', sa.Date(), nullable=False),
+    )
+    op.create_table(
+        'user_tournaments',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), primary_key=True),
+        sa.Column('tournament_id', sa.Integer(), sa.ForeignKey('tournaments.id'), primary_key=True),
+    )
+
+
+def downgrade():
+    op.drop_table('user_tournaments')
+    op.drop_table('tournaments')
+    op.drop_table('users')
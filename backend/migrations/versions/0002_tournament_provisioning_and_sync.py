@@ -0,0 +1,42 @@
+"""Tournament provisioning state and form-response sync high-water mark
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('tournaments') as batch_op:
+        batch_op.alter_column('sheets_link', existing_type=sa.String(), nullable=True)
+        batch_op.alter_column('form_link', existing_type=sa.String(), nullable=True)
+        batch_op.add_column(sa.Column('status', sa.String(), nullable=False, server_default='ready'))
+        batch_op.add_column(sa.Column('provisioning_step', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('provisioning_attempts', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('provisioning_error', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('idempotency_key', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('responses_synced_at', sa.String(), nullable=True))
+        batch_op.create_index('ix_tournaments_idempotency_key', ['idempotency_key'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('tournaments') as batch_op:
+        batch_op.drop_index('ix_tournaments_idempotency_key')
+        batch_op.drop_column('responses_synced_at')
+        batch_op.drop_column('idempotency_key')
+        batch_op.drop_column('provisioning_error')
+        batch_op.drop_column('provisioning_attempts')
+        batch_op.drop_column('provisioning_step')
+        batch_op.drop_column('status')
+        batch_op.alter_column('form_link', existing_type=sa.String(), nullable=False)
+        batch_op.alter_column('sheets_link', existing_type=sa.String(), nullable=False)
@@ -0,0 +1,41 @@
+"""Unique indexes on users.username/email and lookup indexes for tournaments
+
+On PostgreSQL the indexes are built CONCURRENTLY so large tables stay writable.
+Duplicate usernames or emails have to be resolved before upgrading.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_users_username', 'users', ['username'], True),
+    ('ix_users_email', 'users', ['email'], True),
+    ('ix_user_tournaments_tournament_id', 'user_tournaments', ['tournament_id'], False),
+    ('ix_tournaments_name', 'tournaments', ['name'], False),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        # CREATE INDEX CONCURRENTLY can't run inside a transaction
+        with op.get_context().autocommit_block():
+            for name, table, columns, unique in INDEXES:
+                op.create_index(name, table, columns, unique=unique, postgresql_concurrently=True)
+    else:
+        for name, table, columns, unique in INDEXES:
+            op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade():
+    for name, table, columns, unique in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
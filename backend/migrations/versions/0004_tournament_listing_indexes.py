@@ -0,0 +1,42 @@
+"""Indexes for keyset pagination and date-window filters on tournaments
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_tournaments_start_date_id', 'tournaments', ['start_date', 'id']),
+    ('ix_tournaments_end_date', 'tournaments', ['end_date']),
+    ('ix_tournaments_sign_up_deadline', 'tournaments', ['sign_up_deadline']),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        # CREATE INDEX CONCURRENTLY can't run inside a transaction
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, postgresql_concurrently=True)
+            # Lets name_prefix (LIKE 'abc%') use an index regardless of the database collation
+            op.create_index('ix_tournaments_name_pattern', 'tournaments', ['name'],
+                            postgresql_ops={'name': 'text_pattern_ops'}, postgresql_concurrently=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_tournaments_name_pattern', table_name='tournaments')
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
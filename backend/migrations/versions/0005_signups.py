@@ -0,0 +1,36 @@
+"""Signups table: local copy of form responses
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'signups',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('tournament_id', sa.Integer(), sa.ForeignKey('tournaments.id'), nullable=False),
+        sa.Column('game_name', sa.String(), nullable=False),
+        sa.Column('tag_line', sa.String(), nullable=False),
+        sa.Column('submitted_at', sa.DateTime(), nullable=True),
+        sa.Column('response_id', sa.String(), nullable=True),
+        sa.Column('mirrored', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.UniqueConstraint('tournament_id', 'game_name', 'tag_line', name='uq_signups_tournament_player'),
+    )
+    op.create_index('ix_signups_tournament_id_id', 'signups', ['tournament_id', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_signups_tournament_id_id', table_name='signups')
+    op.drop_table('signups')
@@ -0,0 +1,33 @@
+"""Placements table: lobby assignments and results of each tournament round
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'placements',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('tournament_id', sa.Integer(), sa.ForeignKey('tournaments.id'), nullable=False),
+        sa.Column('signup_id', sa.Integer(), sa.ForeignKey('signups.id'), nullable=False),
+        sa.Column('round_number', sa.Integer(), nullable=False),
+        sa.Column('lobby', sa.Integer(), nullable=False),
+        sa.Column('placement', sa.Integer(), nullable=True),
+        sa.UniqueConstraint('tournament_id', 'round_number', 'signup_id', name='uq_placements_round_player'),
+    )
+
+
+def downgrade():
+    op.drop_table('placements')
@@ -0,0 +1,30 @@
+"""Sign-up closing state and lease columns on tournaments
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('tournaments') as batch_op:
+        batch_op.add_column(sa.Column('signups_closed_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('close_lease_owner', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('close_lease_expires_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('tournaments') as batch_op:
+        batch_op.drop_column('close_lease_expires_at')
+        batch_op.drop_column('close_lease_owner')
+        batch_op.drop_column('signups_closed_at')
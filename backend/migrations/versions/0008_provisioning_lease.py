@@ -0,0 +1,28 @@
+"""Provisioning lease columns on tournaments
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('tournaments') as batch_op:
+        batch_op.add_column(sa.Column('provisioning_lease_owner', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('provisioning_lease_expires_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('tournaments') as batch_op:
+        batch_op.drop_column('provisioning_lease_expires_at')
+        batch_op.drop_column('provisioning_lease_owner')
@@ -0,0 +1,9 @@
+import json
+import os
+
+# Let app modules import without AWS; must run before any of them is imported
+os.environ.setdefault('SECRETS_BACKEND', 'env')
+os.environ.setdefault('SECRET_TFT_TOURNAMENT_KEYS', json.dumps({
+    'database_url': 'sqlite://',
+    'secret_key': 'test-secret-key',
+}))
@@ -0,0 +1,35 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('googleapiclient')
+
+from app.utils.google_clients import TokenBucket
+
+
+def acquire_in_thread(bucket, tokens, timeout=5):
+    thread = threading.Thread(target=bucket.acquire, args=(tokens,), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return not thread.is_alive()
+
+
+def test_acquire_within_capacity_does_not_wait():
+    bucket = TokenBucket(rate=1, capacity=10)
+    assert bucket.acquire(10) == 0.0
+
+
+def test_acquire_more_than_capacity_returns():
+    bucket = TokenBucket(rate=100, capacity=10)
+    assert acquire_in_thread(bucket, bucket.capacity + 1)
+
+
+def test_acquire_more_than_capacity_leaves_debt():
+    bucket = TokenBucket(rate=100, capacity=10)
+    assert acquire_in_thread(bucket, 15)
+
+    # 5 tokens of debt plus the one requested take about 60ms to refill
+    start = time.monotonic()
+    bucket.acquire(1)
+    assert time.monotonic() - start >= 0.04
@@ -0,0 +1,35 @@
+import threading
+
+import pytest
+
+pytest.importorskip('googleapiclient')
+
+from benchmarks.fakes import FakeGoogleBackend
+
+from app.utils import google_services
+from app.utils.google_clients import TokenBucket
+from app.utils.google_services import grant_permissions, user_write_permission
+
+
+@pytest.fixture
+def drive(monkeypatch):
+    backend = FakeGoogleBackend(latency=0)
+    monkeypatch.setattr(google_services, 'get_drive_service', lambda google_creds: backend.drive_service())
+    monkeypatch.setitem(google_services.rate_limiters, 'drive', TokenBucket(rate=1000, capacity=10))
+    return backend
+
+
+def test_grant_permissions_for_more_than_five_organizers(drive):
+    # Two grants per organizer, the sheet and the form: 14 sub-requests against a bucket of 10
+    emails = [f"organizer{i}@example.com" for i in range(7)]
+    grants = [(file_id, user_write_permission(email)) for email in emails for file_id in ('sheet-1', 'form-1')]
+
+    result = []
+    thread = threading.Thread(target=lambda: result.append(grant_permissions(grants, {})), daemon=True)
+    thread.start()
+    thread.join(5)
+
+    assert not thread.is_alive()
+    assert len(result[0]) == len(grants)
+    # Split into batches no larger than the bucket
+    assert drive.round_trips == 2
@@ -0,0 +1,55 @@
+import asyncio
+from datetime import date, datetime
+
+import pytest
+
+pytest.importorskip('sqlalchemy')
+pytest.importorskip('aiosqlite')
+pytest.importorskip('fastapi')
+pytest.importorskip('googleapiclient')
+
+from sqlalchemy import select
+
+from benchmarks.db import create_async_sqlite_engine, async_session_factory
+
+from app.endpoints import manage_tournament
+from app.models.db_models import User, Tournament, user_tournaments
+
+
+async def add_with_concurrent_organizer():
+    engine = await create_async_sqlite_engine()
+    try:
+        AsyncSessionLocal = async_session_factory(engine)
+        async with AsyncSessionLocal() as db:
+            owner = User(username='owner', password='x', email='owner@example.com')
+            racer = User(username='racer', password='x', email='racer@example.com')
+            newcomer = User(username='newcomer', password='x', email='newcomer@example.com')
+            tournament = Tournament(name='Tournament', sheets_link='s', form_link='f',
+                                    sign_up_deadline=datetime(2026, 1, 1), start_date=date(2026, 1, 2),
+                                    end_date=date(2026, 1, 3), organizers=[owner])
+            db.add_all([racer, newcomer, tournament])
+            await db.commit()
+            tournament_id = tournament.id
+
+            users = (await db.execute(
+                select(User.id, User.username, User.email).where(User.username.in_(['racer', 'newcomer']))
+            )).all()
+            # Another request adds racer after the endpoint read the organizers
+            async with AsyncSessionLocal() as other:
+                await other.execute(user_tournaments.insert(), [{'user_id': racer.id, 'tournament_id': tournament_id}])
+                await other.commit()
+
+            added = await manage_tournament.insert_organizers(db, tournament_id, users)
+            organizers = set((await db.execute(
+                select(User.username).join(user_tournaments, user_tournaments.c.user_id == User.id)
+                .where(user_tournaments.c.tournament_id == tournament_id)
+            )).scalars().all())
+        return [user.username for user in added], organizers
+    finally:
+        await engine.dispose()
+
+
+def test_insert_organizers_skips_users_added_concurrently():
+    added, organizers = asyncio.run(add_with_concurrent_organizer())
+    assert added == ['newcomer']
+    assert organizers == {'owner', 'racer', 'newcomer'}
@@ -0,0 +1,49 @@
+import asyncio
+from datetime import date, datetime
+
+import pytest
+
+pytest.importorskip('sqlalchemy')
+pytest.importorskip('aiosqlite')
+
+from benchmarks.db import QueryCounter, create_async_sqlite_engine, async_session_factory
+
+from app.endpoints import users
+from app.models.db_models import User, Tournament
+
+# The profile must not issue more queries as the number of tournaments grows
+MAX_PROFILE_QUERIES = 2
+
+
+async def seed(AsyncSessionLocal, tournaments_per_user):
+    async with AsyncSessionLocal() as db:
+        owner = User(username=f'owner{tournaments_per_user}', password='x', email=f'owner{tournaments_per_user}@example.com')
+        co_organizer = User(username=f'co{tournaments_per_user}', password='x', email=f'co{tournaments_per_user}@example.com')
+        for i in range(tournaments_per_user):
+            owner.tournaments.append(Tournament(
+                name=f'Tournament {i}', sheets_link='s', form_link='f', sign_up_deadline=datetime(2026, 1, 1),
+                start_date=date(2026, 1, 2), end_date=date(2026, 1, 3), organizers=[co_organizer],
+            ))
+        db.add(owner)
+        await db.commit()
+        return owner.username
+
+
+async def profile_queries(tournaments_per_user):
+    engine = await create_async_sqlite_engine()
+    try:
+        AsyncSessionLocal = async_session_factory(engine)
+        username = await seed(AsyncSessionLocal, tournaments_per_user)
+        counter = QueryCounter(engine.sync_engine)
+        async with AsyncSessionLocal() as db:
+            profile = await users.load_user_profile(db, username)
+        assert len(profile.tournaments) == tournaments_per_user
+        assert all(len(tournament.organizers) == 2 for tournament in profile.tournaments)
+        return counter.count
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.parametrize('tournaments_per_user', [1, 50])
+def test_user_profile_query_count_is_constant(tournaments_per_user):
+    assert asyncio.run(profile_queries(tournaments_per_user)) <= MAX_PROFILE_QUERIES